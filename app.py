@@ -3,8 +3,9 @@ Gradio app for Indian Stock Market BPE Tokenizer
 Deployable to HuggingFace Spaces
 """
 
-import gradio as gr
-from bpe_tokenizer import BPETokenizer
+from bpe_tokenizer import BPETokenizer, StreamingDecoder
+from worker_pool import TokenizerPool, PoolBusy, PoolTimeout, DEFAULT_TIMEOUT
+import atexit
 import os
 
 
@@ -29,6 +30,62 @@ def load_tokenizer():
 
 # Load tokenizer at startup
 tokenizer = load_tokenizer()
+# Count token usage from real traffic for the Statistics tab. Opt-in (TOKEN_USAGE=1):
+# the tab lists the words visitors typed, which a public Space should not show by default.
+# Word counts cost extra per encode, so the library only keeps them when asked.
+if tokenizer is not None and os.environ.get("TOKEN_USAGE", "0") == "1":
+    tokenizer.enable_usage_tracking(track_words=True)
+# Reverse vocab mapping shared by per-request streaming decoders
+id_to_token = {v: k for k, v in tokenizer.vocab.items()} if tokenizer is not None else {}
+
+
+def start_worker_pool():
+    """Run encode/decode in worker processes when TOKENIZER_WORKERS > 0"""
+    workers = int(os.environ.get("TOKENIZER_WORKERS", "0"))
+    if tokenizer is None or workers <= 0:
+        return None
+    max_pending = int(os.environ.get("TOKENIZER_MAX_PENDING", "0")) or None
+    timeout = float(os.environ.get("TOKENIZER_TIMEOUT", DEFAULT_TIMEOUT))
+    pool = TokenizerPool(tokenizer, workers=workers, max_pending=max_pending, timeout=timeout)
+    atexit.register(pool.close)
+    print(f"Started {pool.workers} tokenizer workers ({pool.start_method}, "
+          f"max {pool.max_pending} pending requests)")
+    return pool
+
+
+# Started before gradio is imported, while this is the only thread, so the
+# workers can be forked and share the loaded tokenizer. Only when run as a
+# script: forkserver/spawn workers re-import this module as __mp_main__.
+pool = start_worker_pool() if __name__ == "__main__" else None
+
+import gradio as gr  # noqa: E402 (after the worker pool, see above)
+
+
+def run_encode(text):
+    """Encode on the worker pool if there is one, else on this thread"""
+    if pool is None:
+        return tokenizer.encode(text)
+    token_ids = pool.encode(text)
+    # Workers do not track usage; count their output here
+    if tokenizer.usage is not None:
+        tokenizer.usage.record(token_ids, text)
+    return token_ids
+
+
+def decode_pieces(token_ids):
+    """Streaming-decoder pieces, decoded on the worker pool if there is one"""
+    if pool is not None:
+        return pool.decode_pieces(token_ids)
+    # Decoders hold per-stream state, so each request gets its own
+    decoder = StreamingDecoder(tokenizer, id_to_token=id_to_token)
+    return decoder.decode_stream(token_ids)
+
+
+def format_pool_error(e):
+    """Message for a request the worker pool rejected or did not finish"""
+    if isinstance(e, PoolBusy):
+        return "**Server busy:** too many requests are being processed. Please try again in a moment."
+    return f"**Request timed out:** {str(e)}. Try a shorter input."
 
 
 def encode_text(text):
@@ -40,8 +97,7 @@ def encode_text(text):
         return "Please enter some text to encode."
     
     try:
-        token_ids = tokenizer.encode(text)
-        id_to_token = {v: k for k, v in tokenizer.vocab.items()}
+        token_ids = run_encode(text)
         tokens = [id_to_token.get(token_id, '<UNK>') for token_id in token_ids]
         
         # Calculate statistics
@@ -68,39 +124,96 @@ def encode_text(text):
             output += f"- Token {i+1}: ID `{token_id}` → `{token}`\n"
         
         return output
+    except (PoolBusy, PoolTimeout) as e:
+        return format_pool_error(e)
     except Exception as e:
         return f"**Error encoding text:** {str(e)}"
 
 
+def parse_token_ids(token_ids_str):
+    """Parse token IDs from string (handle various formats)"""
+    token_ids_str = token_ids_str.strip()
+    # Remove brackets if present
+    if token_ids_str.startswith('[') and token_ids_str.endswith(']'):
+        token_ids_str = token_ids_str[1:-1]
+    # Split by comma and convert to integers
+    return [int(x.strip()) for x in token_ids_str.split(',')]
+
+
+def format_decoded(token_ids, decoded_text, streaming=False):
+    """Format decoded text for display"""
+    output = f"""**Token IDs:** `{token_ids}`
+
+**Decoded Text:** `{decoded_text}`
+
+**Length:** {len(decoded_text)} characters
+"""
+    if streaming:
+        output += "\n_Decoding..._\n"
+    return output
+
+
 def decode_tokens(token_ids_str):
-    """Decode token IDs back to text"""
+    """Decode token IDs back to text, streaming words as they complete"""
     if tokenizer is None:
-        return "**Error:** Tokenizer not found. Please ensure `bpe_tokenizer.json` is present."
+        yield "**Error:** Tokenizer not found. Please ensure `bpe_tokenizer.json` is present."
+        return
     
     if not token_ids_str.strip():
-        return "Please enter token IDs to decode."
+        yield "Please enter token IDs to decode."
+        return
     
     try:
-        # Parse token IDs from string (handle various formats)
-        token_ids_str = token_ids_str.strip()
-        # Remove brackets if present
-        if token_ids_str.startswith('[') and token_ids_str.endswith(']'):
-            token_ids_str = token_ids_str[1:-1]
-        # Split by comma and convert to integers
-        token_ids = [int(x.strip()) for x in token_ids_str.split(',')]
-        decoded_text = tokenizer.decode(token_ids)
-        
-        output = f"""**Token IDs:** `{token_ids}`
+        token_ids = parse_token_ids(token_ids_str)
+    except ValueError as e:
+        yield f"**Error:** Invalid token ID format. Please enter comma-separated token IDs.\n\n**Example:** `1825, 80` or `[1825, 80]`\n\n**Error details:** {str(e)}"
+        return
+    
+    try:
+        decoded_text = ""
+        for piece in decode_pieces(token_ids):
+            decoded_text += piece
+            yield format_decoded(token_ids, decoded_text, streaming=True)
+        yield format_decoded(token_ids, decoded_text)
+    except (PoolBusy, PoolTimeout) as e:
+        yield format_pool_error(e)
+    except Exception as e:
+        yield f"**Error decoding tokens:** {str(e)}"
 
-**Decoded Text:** `{decoded_text}`
 
-**Length:** {len(decoded_text)} characters
+def format_usage():
+    """Format token usage counters collected from encode requests"""
+    usage = tokenizer.usage
+    if usage is None:
+        return "\n### Token Usage\nUsage tracking is off. Set `TOKEN_USAGE=1` to enable it.\n"
+    
+    vocab_count = len(tokenizer.vocab)
+    dead = usage.dead_tokens(tokenizer.vocab)
+    used = vocab_count - len(dead)
+    output = f"""
+### Token Usage
+- **Encode Calls Recorded:** {usage.calls:,}
+- **Tokens Produced:** {usage.total():,}
+- **Vocabulary Utilization:** {used:,} / {vocab_count:,} tokens ({100 * used / max(vocab_count, 1):.1f}%)
+
+#### Utilization Histogram
+| Times Used | Tokens |
+|---|---|
 """
-        return output
-    except ValueError as e:
-        return f"**Error:** Invalid token ID format. Please enter comma-separated token IDs.\n\n**Example:** `1825, 80` or `[1825, 80]`\n\n**Error details:** {str(e)}"
-    except Exception as e:
-        return f"**Error decoding tokens:** {str(e)}"
+    for bucket, count in usage.histogram():
+        output += f"| {bucket} | {count:,} |\n"
+    
+    output += "\n#### Hottest Words\n| Word | Count |\n|---|---|\n"
+    for word, count in usage.hottest_words(20):
+        output += f"| `{word}` | {count:,} |\n"
+    
+    output += "\n#### Hottest Tokens\n| Token | Count |\n|---|---|\n"
+    for token, count in usage.hottest_tokens(tokenizer.vocab, 20):
+        output += f"| `{token}` | {count:,} |\n"
+    
+    output += f"\n#### Dead Tokens ({len(dead):,} never used, first 50)\n"
+    output += " ".join(f"`{token}`" for token in dead[:50]) + "\n"
+    return output
 
 
 def get_statistics():
@@ -129,6 +242,8 @@ def get_statistics():
         tokens_row = sample_tokens[i:i+10]
         stats += "| " + " | ".join([f"`{t}`" for t in tokens_row]) + " |\n"
     
+    stats += format_usage()
+    
     stats += "\n### Tokenizer Details\n"
     stats += f"- Trained on Indian stock market data (NSE and BSE)\n"
     stats += f"- Optimized for stock tickers, company names, and financial terms\n"
@@ -265,6 +380,9 @@ def create_interface():
 
 if __name__ == "__main__":
     demo = create_interface()
+    if pool is not None:
+        # Let Gradio run as many handlers at once as the pool accepts
+        demo.queue(default_concurrency_limit=pool.max_pending)
     # Launch the app
     # For HuggingFace Spaces, this will be called automatically
     # For local testing, you can use share=True to get a public link
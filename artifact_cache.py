@@ -0,0 +1,134 @@
+"""
+Content-addressed artifact cache for corpus generation and tokenizer training
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import List, Optional, Any
+
+from bpe_tokenizer import BPETokenizer
+
+
+DEFAULT_CACHE_DIR = ".artifact_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 60 * 60  # 30 days
+
+
+def compute_key(*parts: Any) -> str:
+    """Hash JSON-serializable inputs into a stable cache key"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ArtifactCache:
+    """Directory of artifacts addressed by the hash of their inputs"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, kind: str, key: str, ext: str) -> str:
+        """Location of an artifact inside the cache directory"""
+        return os.path.join(self.cache_dir, f"{kind}-{key}.{ext}")
+
+    def _lookup(self, path: str) -> bool:
+        """Check for an artifact and mark it as recently used"""
+        if not os.path.exists(path):
+            return False
+        # Touch on hit so size eviction drops least recently used entries first
+        os.utime(path, None)
+        return True
+
+    def _write_atomic(self, path: str, write_to):
+        """Write through a temp file so readers never see partial artifacts"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            write_to(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load_corpus(self, key: str) -> Optional[List[str]]:
+        """Return the cached corpus for key, or None on a miss"""
+        path = self.path('corpus', key, 'txt')
+        if not self._lookup(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().split('\n')[:-1]
+
+    def store_corpus(self, key: str, corpus: List[str]) -> str:
+        """Cache a corpus, one entry per line"""
+        path = self.path('corpus', key, 'txt')
+
+        def write_to(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for item in corpus:
+                    f.write(item + '\n')
+
+        self._write_atomic(path, write_to)
+        self.evict()
+        return path
+
+    def load_tokenizer(self, key: str) -> Optional[BPETokenizer]:
+        """Return the cached trained tokenizer for key, or None on a miss"""
+        path = self.path('tokenizer', key, 'json')
+        if not self._lookup(path):
+            return None
+        tokenizer = BPETokenizer()
+        tokenizer.load(path)
+        return tokenizer
+
+    def store_tokenizer(self, key: str, tokenizer: BPETokenizer) -> str:
+        """Cache a trained tokenizer in its save() format"""
+        path = self.path('tokenizer', key, 'json')
+        self._write_atomic(path, tokenizer.save)
+        self.evict()
+        return path
+
+    def evict(self) -> List[str]:
+        """Drop expired entries, then least recently used ones over the size limit"""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not os.path.isfile(path) or name.endswith('.tmp'):
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        removed = []
+        kept = []
+        for mtime, size, path in entries:
+            if self.max_age_seconds is not None and now - mtime > self.max_age_seconds:
+                os.remove(path)
+                removed.append(path)
+            else:
+                kept.append((mtime, size, path))
+
+        if self.max_bytes is not None:
+            kept.sort()  # Oldest first
+            total = sum(size for _, size, _ in kept)
+            while kept and total > self.max_bytes:
+                _, size, path = kept.pop(0)
+                os.remove(path)
+                removed.append(path)
+                total -= size
+
+        return removed
+
+    def clear(self):
+        """Remove every cached artifact"""
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isfile(path):
+                os.remove(path)
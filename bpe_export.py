@@ -0,0 +1,236 @@
+"""
+Export/import the BPE tokenizer in the standard vocab.json + merges.txt layout
+
+BPETokenizer keeps the end-of-word marker as a separate symbol ("S", "E",
+"</w>") that merges absorb like any other. The export writes that symbol
+as one reserved character, so every merge carries over one-to-one and
+token ids stay the same. Runtimes reproduce the symbol by appending the
+character to each word before BPE (see runtime_tokenizer()). Added tokens
+(e.g. tickers) are written to added_tokens.json with their ids.
+verify_export() encodes a corpus both ways and reports any ids that differ.
+"""
+
+import argparse
+import json
+import os
+from typing import List, Dict, Tuple, Optional
+
+from bpe_tokenizer import BPETokenizer
+
+
+END_OF_WORD = '</w>'
+# Private-use character standing in for END_OF_WORD in exported files
+EXPORT_END_OF_WORD = '\ue000'
+# Marks word starts in the runtime, so added tokens only match whole words
+EXPORT_WORD_START = '\ue001'
+MERGES_HEADER = '#version: 0.2'
+
+
+def to_export_symbols(tokenizer: BPETokenizer) -> Tuple[Dict[str, int], List[Tuple[str, str]]]:
+    """Vocab and merges with END_OF_WORD written as EXPORT_END_OF_WORD"""
+    if tokenizer.case_normalize:
+        # Case markers come from split_case(), which no vocab/merges runtime can
+        # reproduce, so the export would encode differently from the tokenizer
+        raise ValueError("Case-normalized tokenizers cannot be exported to vocab.json + merges.txt")
+    for reserved in (EXPORT_END_OF_WORD, EXPORT_WORD_START):
+        if any(reserved in token for token in tokenizer.vocab):
+            raise ValueError(f"Vocabulary already uses the reserved character {reserved!r}")
+
+    def rename(symbol):
+        return symbol.replace(END_OF_WORD, EXPORT_END_OF_WORD)
+
+    vocab = {rename(token): token_id for token, token_id in tokenizer.vocab.items()}
+    merges = [(rename(left), rename(right)) for (left, right), _ in tokenizer.merges]
+    return vocab, merges
+
+
+def export_vocab_merges(tokenizer: BPETokenizer, output_dir: str,
+                        prefix: Optional[str] = None) -> Tuple[str, str]:
+    """Write vocab.json, merges.txt and added_tokens.json; return the first two paths"""
+    vocab, merges = to_export_symbols(tokenizer)  # Raises before anything is written
+    os.makedirs(output_dir, exist_ok=True)
+    name = f"{prefix}-" if prefix else ""
+    vocab_path = os.path.join(output_dir, f"{name}vocab.json")
+    merges_path = os.path.join(output_dir, f"{name}merges.txt")
+    added_path = added_tokens_path(vocab_path)
+
+    with open(vocab_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(vocab.items(), key=lambda item: item[1])), f,
+                  ensure_ascii=False, indent=2)
+    with open(merges_path, 'w', encoding='utf-8') as f:
+        f.write(MERGES_HEADER + '\n')
+        for left, right in merges:
+            f.write(f"{left} {right}\n")
+    # Always written, so a stale file from an earlier export is not picked up
+    with open(added_path, 'w', encoding='utf-8') as f:
+        json.dump(tokenizer.added_tokens, f, ensure_ascii=False, indent=2)
+
+    print(f"Exported {len(vocab)} tokens, {len(merges)} merges and "
+          f"{len(tokenizer.added_tokens)} added tokens to {output_dir}")
+
+    # vocab.json + merges.txt cannot carry the end-of-word step; tokenizer.json can
+    runtime = runtime_tokenizer(vocab_path, merges_path)
+    if runtime is not None:
+        runtime.save(os.path.join(output_dir, f"{name}tokenizer.json"))
+    return vocab_path, merges_path
+
+
+def added_tokens_path(vocab_path: str) -> str:
+    """The added_tokens.json written next to vocab_path"""
+    return vocab_path[:-len('vocab.json')] + 'added_tokens.json'
+
+
+def _load_added_tokens(vocab_path: str) -> Dict[str, int]:
+    """Added tokens exported with vocab_path; none if the file is missing"""
+    path = added_tokens_path(vocab_path)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def import_vocab_merges(vocab_path: str, merges_path: str) -> BPETokenizer:
+    """Load vocab.json + merges.txt (and added_tokens.json) written by export_vocab_merges()"""
+    def restore(symbol):
+        return symbol.replace(EXPORT_END_OF_WORD, END_OF_WORD)
+
+    with open(vocab_path, 'r', encoding='utf-8') as f:
+        vocab = {restore(token): token_id for token, token_id in json.load(f).items()}
+    merges = []
+    with open(merges_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#version'):
+                continue
+            left, right = line.split(' ')
+            merges.append((restore(left), restore(right)))
+
+    tokenizer = BPETokenizer(vocab_size=len(vocab))
+    tokenizer.vocab = vocab
+    tokenizer.merges = [(pair, vocab[''.join(pair)]) for pair in merges]
+    tokenizer.added_tokens = _load_added_tokens(vocab_path)
+    for token in tokenizer.added_tokens:
+        tokenizer._insert_added(token)
+    return tokenizer
+
+
+def _encode_words(tokenizer: BPETokenizer, texts: List[str]) -> List[List[int]]:
+    """Encode texts word by word, encoding each distinct word only once"""
+    if tokenizer.added_tokens:
+        # Added tokens may span several words, so lines are encoded whole
+        return [tokenizer.encode(text) for text in texts]
+    word_ids = {}
+    results = []
+    for text in texts:
+        ids = []
+        for word in text.split():
+            if word not in word_ids:
+                word_ids[word] = tokenizer.encode(word)
+            ids.extend(word_ids[word])
+        results.append(ids)
+    return results
+
+
+def runtime_tokenizer(vocab_path: str, merges_path: str):
+    """Build a `tokenizers` pipeline for the export; None if it is not installed
+
+    A zero-width replace appends EXPORT_END_OF_WORD to every word, so the
+    runtime splits "NSE" into "N", "S", "E", EXPORT_END_OF_WORD exactly as
+    BPETokenizer does. Words also get an EXPORT_WORD_START prefix, removed
+    again before BPE, so that added tokens from added_tokens.json only
+    match at word starts and ends, as in BPETokenizer._split_added().
+    """
+    try:
+        from tokenizers import (Tokenizer, Regex, AddedToken, models, normalizers,
+                                pre_tokenizers, decoders)
+    except ImportError:
+        return None
+    runtime = Tokenizer(models.BPE.from_file(vocab_path, merges_path))
+    runtime.normalizer = normalizers.Sequence([
+        normalizers.Replace(Regex(r'(?<!\S)(?=\S)'), EXPORT_WORD_START),
+        # Added tokens already end in EXPORT_END_OF_WORD and must not get a second one
+        normalizers.Replace(Regex(rf'(?<=[^\s{EXPORT_END_OF_WORD}])(?=\s|$)'), EXPORT_END_OF_WORD),
+    ])
+    runtime.pre_tokenizer = pre_tokenizers.Sequence([
+        pre_tokenizers.Split(EXPORT_WORD_START, 'removed'),
+        pre_tokenizers.WhitespaceSplit(),
+    ])
+    runtime.decoder = decoders.Sequence([
+        decoders.Replace(EXPORT_WORD_START, ''),
+        decoders.Replace(EXPORT_END_OF_WORD + ' ', ' '),  # Inside multi-word added tokens
+        decoders.BPEDecoder(suffix=EXPORT_END_OF_WORD),
+    ])
+    # Registered in the exported vocab form, so each keeps its vocab.json id;
+    # matching runs on the normalized text, longest match first
+    runtime.add_tokens([AddedToken(token + EXPORT_END_OF_WORD, normalized=True)
+                        for token in _load_added_tokens(vocab_path)])
+    return runtime
+
+
+def _runtime_encode(vocab_path: str, merges_path: str, texts: List[str]) -> Optional[List[List[int]]]:
+    """Encode with the `tokenizers` runtime if it is installed"""
+    runtime = runtime_tokenizer(vocab_path, merges_path)
+    if runtime is None:
+        return None
+    return [encoding.ids for encoding in runtime.encode_batch(texts, add_special_tokens=False)]
+
+
+def verify_export(tokenizer: BPETokenizer, vocab_path: str, merges_path: str,
+                  corpus: List[str], max_examples: int = 10) -> Dict:
+    """Encode the corpus with the original and exported tokenizers and compare ids"""
+    texts = list(dict.fromkeys(corpus))  # Duplicated lines encode identically
+    expected = _encode_words(tokenizer, texts)
+
+    engines = {'imported': _encode_words(import_vocab_merges(vocab_path, merges_path), texts)}
+    runtime_ids = _runtime_encode(vocab_path, merges_path, texts)
+    if runtime_ids is not None:
+        engines['tokenizers'] = runtime_ids
+
+    report = {'texts': len(texts), 'engines': {}}
+    for name, actual in engines.items():
+        mismatches = [(text, want, got)
+                      for text, want, got in zip(texts, expected, actual) if want != got]
+        report['engines'][name] = {
+            'mismatches': len(mismatches),
+            'examples': mismatches[:max_examples],
+        }
+    report['identical'] = all(r['mismatches'] == 0 for r in report['engines'].values())
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export tokenizer to vocab.json + merges.txt")
+    parser.add_argument("--tokenizer", default="bpe_tokenizer.json", help="Trained tokenizer file")
+    parser.add_argument("--output-dir", default="export", help="Directory for vocab.json and merges.txt")
+    parser.add_argument("--corpus", default="stock_corpus.txt", help="Corpus used for verification")
+    parser.add_argument("--no-verify", action="store_true", help="Skip the equivalence check")
+    args = parser.parse_args(argv)
+
+    tokenizer = BPETokenizer()
+    tokenizer.load(args.tokenizer)
+    try:
+        vocab_path, merges_path = export_vocab_merges(tokenizer, args.output_dir)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    if args.no_verify:
+        return 0
+
+    with open(args.corpus, 'r', encoding='utf-8') as f:
+        corpus = f.read().splitlines()
+    report = verify_export(tokenizer, vocab_path, merges_path, corpus)
+
+    print(f"\n{'='*60}")
+    print(f"Verified {report['texts']} distinct corpus lines")
+    if 'tokenizers' not in report['engines']:
+        print("(`tokenizers` not installed: checked the pure-Python importer only)")
+    for name, result in report['engines'].items():
+        status = '✓ IDENTICAL' if result['mismatches'] == 0 else f"✗ {result['mismatches']} MISMATCHES"
+        print(f"{name}: {status}")
+        for text, want, got in result['examples']:
+            print(f"  '{text}': expected {want}, got {got}")
+    return 0 if report['identical'] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+"""
+NumPy backend for BPE training pair statistics
+
+All words live in one concatenated int32 symbol array with a parallel
+word-index array and per-word frequencies. Pair counts come from a single
+weighted np.unique/np.bincount pass and merges are applied with vectorized
+masks, replacing the per-word Python loops of BPETokenizer._get_stats and
+BPETokenizer._merge_vocab. Ties are broken by first occurrence, the same
+way max() over the reference's insertion-ordered dict breaks them, so the
+learned merges are identical.
+"""
+
+from typing import Dict, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; training falls back to pure Python
+    np = None
+
+
+HAS_NUMPY = np is not None
+
+
+class NumpyPairTable:
+    """Vectorized pair statistics over a space-separated word vocabulary"""
+
+    def __init__(self, vocab: Dict[str, int]):
+        if np is None:
+            raise ImportError("NumpyPairTable requires numpy")
+        self.symbol_ids = {}  # symbol string -> int code
+        self.symbols = []  # int code -> symbol string
+
+        codes, word_index, freqs = [], [], []
+        for index, (word, freq) in enumerate(vocab.items()):
+            symbols = word.split()
+            codes.extend(self._code(symbol) for symbol in symbols)
+            word_index.extend([index] * len(symbols))
+            freqs.append(freq)
+        self.syms = np.array(codes, dtype=np.int32)
+        self.word_index = np.array(word_index, dtype=np.int32)
+        self.freqs = np.array(freqs, dtype=np.int64)
+
+    def _code(self, symbol: str) -> int:
+        """Int code for a symbol string, assigning a new one if needed"""
+        code = self.symbol_ids.get(symbol)
+        if code is None:
+            code = len(self.symbols)
+            self.symbol_ids[symbol] = code
+            self.symbols.append(symbol)
+        return code
+
+    def _pairs(self) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Pair codes and left positions of every adjacent pair inside a word"""
+        positions = np.flatnonzero(self.word_index[:-1] == self.word_index[1:])
+        pair_codes = (self.syms[positions].astype(np.int64) << 32) | self.syms[positions + 1]
+        return pair_codes, positions
+
+    def best_pair(self) -> Optional[Tuple[str, str]]:
+        """Most frequent pair weighted by word frequency; None when no pairs remain"""
+        pair_codes, positions = self._pairs()
+        if pair_codes.size == 0:
+            return None
+        unique, first, inverse = np.unique(pair_codes, return_index=True, return_inverse=True)
+        counts = np.bincount(inverse, weights=self.freqs[self.word_index[positions]])
+        # Among the most frequent pairs, take the one that appears first
+        tied = np.flatnonzero(counts == counts.max())
+        best = unique[tied[np.argmin(first[tied])]]
+        return self.symbols[int(best >> 32)], self.symbols[int(best & 0xFFFFFFFF)]
+
+    def merge(self, pair: Tuple[str, str]):
+        """Replace every non-overlapping occurrence of pair, left to right"""
+        left, right = self.symbol_ids[pair[0]], self.symbol_ids[pair[1]]
+        pair_codes, positions = self._pairs()
+        matches = positions[pair_codes == ((left << 32) | right)]
+        if matches.size == 0:
+            return
+        if left == right and matches.size > 1:
+            # In runs like "a a a" only every other overlapping match is taken
+            run_break = np.concatenate(([True], np.diff(matches) != 1))
+            run_start = np.maximum.accumulate(np.where(run_break, np.arange(matches.size), 0))
+            matches = matches[(np.arange(matches.size) - run_start) % 2 == 0]
+
+        self.syms[matches] = self._code(pair[0] + pair[1])
+        keep = np.ones(self.syms.size, dtype=bool)
+        keep[matches + 1] = False
+        self.syms = self.syms[keep]
+        self.word_index = self.word_index[keep]
@@ -2,19 +2,66 @@
 Byte-Pair Encoding (BPE) Tokenizer for Indian Stock Market Data
 """
 
+from array import array
 from collections import defaultdict, Counter
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Union, Iterable, Iterator
+import bisect
 import re
+import threading
+
+
+# Case markers used when case normalization is on: the next word is restored
+# to ALL CAPS (<U>) or Title case (<T>); unmarked words are used as-is
+UPPER_MARKER = '<U>'
+TITLE_MARKER = '<T>'
+CASE_MARKERS = (UPPER_MARKER, TITLE_MARKER)
+
+
+def split_case(word: str) -> Tuple[Optional[str], str]:
+    """Lowercase a word, returning the marker needed to restore it
+    
+    Words that are neither lowercase, ALL CAPS nor Title case (e.g.
+    "HDFCBank"), or that would not round-trip, are returned unchanged.
+    """
+    lowered = word.lower()
+    if lowered == word:
+        return None, word
+    for marker in CASE_MARKERS:
+        if restore_case(marker, lowered) == word:
+            return marker, lowered
+    return None, word
+
+
+def restore_case(marker: Optional[str], text: str, first: bool = True) -> str:
+    """Undo split_case for a word (or a later piece of it when first=False)"""
+    if marker == UPPER_MARKER:
+        return text.upper()
+    if marker == TITLE_MARKER and first:
+        return text[:1].upper() + text[1:]
+    return text
 
 
 class BPETokenizer:
     """Byte-Pair Encoding tokenizer implementation"""
     
-    def __init__(self, vocab_size: int = 5000):
+    def __init__(self, vocab_size: int = 5000, case_normalize: bool = False,
+                 encode_backend: str = 'regex'):
         self.vocab_size = vocab_size
+        # Lowercase words before BPE and encode their case with marker tokens
+        self.case_normalize = case_normalize
         self.vocab = {}  # token_id -> token
         self.merges = []  # List of merge rules (pair, new_token_id)
         self.word_freqs = {}
+        self._merge_patterns = None  # Compiled merge regexes, built on first encode
+        # 'regex' applies every merge rule in turn (the reference); 'ranked'
+        # only visits the pairs present in the word (see _apply_bpe_ranked)
+        if encode_backend not in ('regex', 'ranked'):
+            raise ValueError(f"Unknown encode backend: {encode_backend}")
+        self.encode_backend = encode_backend
+        self._merge_ranks = None  # (left, right) -> ranks, built on first ranked encode
+        self.added_tokens = {}  # Registered whole-word strings -> fixed token_id
+        self._added_trie = {}  # Character trie over added_tokens for longest match
+        self.usage = None  # Optional TokenUsage updated by encode()
         
     def _get_word_freqs(self, corpus: List[str]) -> Dict[str, int]:
         """Calculate word frequencies from corpus"""
@@ -23,6 +70,9 @@ class BPETokenizer:
             # Split by whitespace and count frequencies
             words = text.split()
             for word in words:
+                if self.case_normalize:
+                    # "RELIANCE", "Reliance" and "reliance" all train as "reliance"
+                    word = split_case(word)[1]
                 word_freqs[word] += 1
         return dict(word_freqs)
     
@@ -45,8 +95,18 @@ class BPETokenizer:
             new_vocab[new_word] = vocab[word]
         return new_vocab
     
-    def train(self, corpus: List[str]):
-        """Train the BPE tokenizer on the corpus"""
+    def train(self, corpus: List[str], backend: str = 'auto'):
+        """Train the BPE tokenizer on the corpus
+        
+        backend selects how pair statistics are computed: 'python' (the
+        original loops), 'numpy' (vectorized, see bpe_numpy.py) or 'auto'
+        (NumPy when installed). Both produce identical merges.
+        """
+        from bpe_numpy import HAS_NUMPY, NumpyPairTable
+        if backend not in ('auto', 'python', 'numpy'):
+            raise ValueError(f"Unknown training backend: {backend}")
+        use_numpy = backend == 'numpy' or (backend == 'auto' and HAS_NUMPY)
+        
         print(f"Training BPE tokenizer to {self.vocab_size} tokens...")
         
         # Get word frequencies
@@ -65,23 +125,36 @@ class BPETokenizer:
         chars = set()
         for word in vocab.keys():
             chars.update(word.split())
+        if self.case_normalize:
+            chars.update(CASE_MARKERS)
         
         # Initialize token to id mapping
         self.vocab = {char: idx for idx, char in enumerate(sorted(chars))}
         num_merges = self.vocab_size - len(self.vocab)
         
+        self._merge_patterns = None
+        self._merge_ranks = None
+        
         print(f"Starting with {len(self.vocab)} base tokens")
-        print(f"Will perform {num_merges} merges...")
+        print(f"Will perform {num_merges} merges ({'numpy' if use_numpy else 'python'} backend)...")
+        
+        table = NumpyPairTable(vocab) if use_numpy else None
         
         # Perform merges
         for i in range(num_merges):
-            pairs = self._get_stats(vocab)
-            if not pairs:
-                break
-                
-            # Get most frequent pair
-            best_pair = max(pairs, key=pairs.get)
-            vocab = self._merge_vocab(best_pair, vocab)
+            if table is not None:
+                best_pair = table.best_pair()
+                if best_pair is None:
+                    break
+                table.merge(best_pair)
+            else:
+                pairs = self._get_stats(vocab)
+                if not pairs:
+                    break
+                    
+                # Get most frequent pair
+                best_pair = max(pairs, key=pairs.get)
+                vocab = self._merge_vocab(best_pair, vocab)
             
             # Add new token to vocabulary
             new_token = ''.join(best_pair)
@@ -105,19 +178,166 @@ class BPETokenizer:
             word = ' '.join(list(word)) + ' </w>'
         
         # Apply all merge rules
-        for pair, _ in self.merges:
-            bigram = re.escape(' '.join(pair))
-            p = re.compile(r'(?<!\S)' + bigram + r'(?!\S)')
-            word = p.sub(''.join(pair), word)
+        for p, merged in self._get_merge_patterns():
+            word = p.sub(merged, word)
         
         return word.split()
     
+    def _get_merge_patterns(self) -> List[Tuple[re.Pattern, str]]:
+        """Compile each merge rule once instead of on every word"""
+        if self._merge_patterns is None:
+            patterns = []
+            for pair, _ in self.merges:
+                bigram = re.escape(' '.join(pair))
+                p = re.compile(r'(?<!\S)' + bigram + r'(?!\S)')
+                patterns.append((p, ''.join(pair)))
+            self._merge_patterns = patterns
+        return self._merge_patterns
+    
+    def _apply_bpe_ranked(self, word: str) -> List[str]:
+        """Same result as _apply_bpe, without scanning the whole merge list
+        
+        _apply_bpe applies merge rules in rank order, each to every
+        non-overlapping occurrence left to right. Rules whose pair is not in
+        the word do nothing, so this jumps straight to the lowest rank after
+        the last applied one whose pair is present, and stops when none is.
+        """
+        ranks = self._get_merge_ranks()
+        symbols = list(word) + ['</w>']
+        last_rank = -1
+        while len(symbols) > 1:
+            best_rank, best_pair = None, None
+            for pair in zip(symbols, symbols[1:]):
+                pair_ranks = ranks.get(pair)
+                if pair_ranks is None or pair_ranks[-1] <= last_rank:
+                    continue
+                # A pair can be listed more than once; take its next rank
+                rank = pair_ranks[bisect.bisect_right(pair_ranks, last_rank)]
+                if best_rank is None or rank < best_rank:
+                    best_rank, best_pair = rank, pair
+            if best_pair is None:
+                break
+            left, right = best_pair
+            merged = []
+            i = 0
+            while i < len(symbols):
+                if i + 1 < len(symbols) and symbols[i] == left and symbols[i + 1] == right:
+                    merged.append(left + right)
+                    i += 2
+                else:
+                    merged.append(symbols[i])
+                    i += 1
+            symbols = merged
+            last_rank = best_rank
+        return symbols
+    
+    def _get_merge_ranks(self) -> Dict[Tuple[str, str], List[int]]:
+        """Map each merge pair to the (ascending) ranks it appears at"""
+        if self._merge_ranks is None:
+            ranks = {}
+            for rank, (pair, _) in enumerate(self.merges):
+                ranks.setdefault(tuple(pair), []).append(rank)
+            self._merge_ranks = ranks
+        return self._merge_ranks
+    
+    def add_tokens(self, tokens: Iterable[str]) -> int:
+        """Register strings (e.g. tickers) that encode to a single fixed id
+        
+        Added tokens are matched before BPE, longest match first, and only as
+        whole words (a token may span several words, e.g. "HDFC BANK").
+        Strings that BPE already learned as one word keep that token's id;
+        the rest get new ids after the current vocabulary. Returns the
+        number of newly registered tokens.
+        """
+        added = 0
+        next_id = max(self.vocab.values(), default=-1) + 1
+        for token in tokens:
+            token = ' '.join(token.split())
+            if not token or token in self.added_tokens:
+                continue
+            # Stored with </w> so decode() restores the following space
+            key = token + '</w>'
+            if key not in self.vocab:
+                self.vocab[key] = next_id
+                next_id += 1
+            self.added_tokens[token] = self.vocab[key]
+            self._insert_added(token)
+            added += 1
+        if self.usage is not None:
+            self.usage.resize(next_id)
+        return added
+    
+    def _insert_added(self, token: str):
+        """Add one token to the added-token trie"""
+        node = self._added_trie
+        for char in token:
+            node = node.setdefault(char, {})
+        node[None] = self.added_tokens[token]  # None marks the end of a token
+    
+    def _split_added(self, text: str) -> List[Tuple[str, Optional[int]]]:
+        """Split text into (plain text, None) and (added token, id) segments"""
+        if not self.added_tokens:
+            return [(text, None)]
+        segments = []
+        trie = self._added_trie
+        n = len(text)
+        start = 0  # Beginning of the pending plain-text segment
+        i = 0
+        while i < n:
+            # Added tokens only start at word starts
+            if text[i].isspace() or (i > 0 and not text[i - 1].isspace()):
+                i += 1
+                continue
+            node = trie
+            j = i
+            match_end, match_id = -1, None
+            while j < n and text[j] in node:
+                node = node[text[j]]
+                j += 1
+                # ...and only end at word ends
+                if None in node and (j == n or text[j].isspace()):
+                    match_end, match_id = j, node[None]
+            if match_id is None:
+                i += 1
+                continue
+            if start < i:
+                segments.append((text[start:i], None))
+            segments.append((text[i:match_end], match_id))
+            start = i = match_end
+        if start < n:
+            segments.append((text[start:], None))
+        return segments
+    
     def encode(self, text: str) -> List[int]:
         """Encode text into token IDs"""
-        words = text.split()
         token_ids = []
+        for segment, added_id in self._split_added(text):
+            if added_id is not None:
+                token_ids.append(added_id)
+            else:
+                self._encode_words(segment, token_ids)
+        if self.usage is not None:
+            self.usage.record(token_ids, text)
+        return token_ids
+    
+    def enable_usage_tracking(self, track_words: bool = False) -> 'TokenUsage':
+        """Start counting token (and optionally word) usage on every encode()"""
+        size = max(self.vocab.values(), default=-1) + 1
+        self.usage = TokenUsage(size, track_words=track_words)
+        return self.usage
+    
+    def _encode_words(self, text: str, token_ids: List[int]):
+        """Run BPE over each whitespace-separated word, appending ids"""
+        words = text.split()
         for word in words:
-            tokens = self._apply_bpe(word)
+            if self.case_normalize:
+                marker, word = split_case(word)
+                if marker is not None:
+                    token_ids.append(self.vocab[marker])
+            if self.encode_backend == 'ranked':
+                tokens = self._apply_bpe_ranked(word)
+            else:
+                tokens = self._apply_bpe(word)
             for token in tokens:
                 if token in self.vocab:
                     token_ids.append(self.vocab[token])
@@ -126,10 +346,12 @@ class BPETokenizer:
                     for char in token:
                         if char in self.vocab:
                             token_ids.append(self.vocab[char])
-        return token_ids
     
     def decode(self, token_ids: List[int]) -> str:
         """Decode token IDs back to text"""
+        if self.case_normalize:
+            # Case markers apply per word, which the streaming decoder tracks
+            return ''.join(StreamingDecoder(self).decode_stream(token_ids))
         # Reverse vocab mapping
         id_to_token = {v: k for k, v in self.vocab.items()}
         tokens = [id_to_token.get(id, '<UNK>') for id in token_ids]
@@ -162,21 +384,260 @@ class BPETokenizer:
         """Save tokenizer to file"""
         import json
         with open(filepath, 'w') as f:
-            json.dump({
-                'vocab': self.vocab,
-                'merges': self.merges,
-                'vocab_size': self.vocab_size,
-                'word_freqs': dict(list(self.word_freqs.items())[:1000])  # Save sample
-            }, f, indent=2)
+            json.dump(self.get_state(), f, indent=2)
+    
+    def get_state(self) -> Dict:
+        """The tokenizer as a JSON-serializable dict, in the save() format"""
+        return {
+            'vocab': self.vocab,
+            'merges': self.merges,
+            'vocab_size': self.vocab_size,
+            'case_normalize': self.case_normalize,
+            'added_tokens': self.added_tokens,
+            'word_freqs': dict(list(self.word_freqs.items())[:1000])  # Save sample
+        }
     
     def load(self, filepath: str):
         """Load tokenizer from file"""
         import json
         with open(filepath, 'r') as f:
-            data = json.load(f)
-            self.vocab = data['vocab']
-            self.merges = data['merges']
-            self.vocab_size = data['vocab_size']
-            self.word_freqs = data.get('word_freqs', {})
+            self.load_state(json.load(f))
+    
+    def load_state(self, data: Dict):
+        """Restore the tokenizer from a dict in the save() format"""
+        self.vocab = data['vocab']
+        self.merges = data['merges']
+        self.vocab_size = data['vocab_size']
+        self.case_normalize = data.get('case_normalize', False)
+        self.word_freqs = data.get('word_freqs', {})
+        self._merge_patterns = None
+        self._merge_ranks = None
+        self.added_tokens = data.get('added_tokens', {})
+        self._added_trie = {}
+        for token in self.added_tokens:
+            self._insert_added(token)
+
+
+class StreamingDecoder:
+    """Incremental detokenizer for token-by-token output
+    
+    Feed ids as they are produced and get back text pieces as soon as a
+    </w> boundary completes a word. Joining every piece plus finish()
+    gives the same text as BPETokenizer.decode on the full id list.
+    """
+    
+    END_OF_WORD = '</w>'
+    
+    def __init__(self, tokenizer: BPETokenizer, max_buffer_tokens: int = 256,
+                 id_to_token: Optional[Dict[int, str]] = None):
+        # Callers creating many decoders can share one reverse mapping
+        self.id_to_token = id_to_token or {v: k for k, v in tokenizer.vocab.items()}
+        self.max_buffer_tokens = max_buffer_tokens
+        self._buffer = []  # Tokens of the word currently being built
+        self._pending_spaces = 0  # Word boundaries not yet written out
+        self._started = False  # Whether any text has been emitted (mirrors strip())
+        self.case_normalize = tokenizer.case_normalize
+        self._case = None  # Case marker for the word being built
+        self._case_first = True  # Whether the next piece starts that word
+    
+    def _emit(self, word: str) -> Optional[str]:
+        """Turn a finished word into an output piece"""
+        if not word:
+            # Empty words only widen the gap before the next word
+            if self._started:
+                self._pending_spaces += 1
+            return None
+        piece = ' ' * self._pending_spaces + word if self._started else word
+        self._started = True
+        self._pending_spaces = 1
+        return piece
+    
+    def step(self, token_id: int) -> Optional[str]:
+        """Consume one id; return a text piece if it completed a word"""
+        token = self.id_to_token.get(token_id, '<UNK>')
+        if self.case_normalize and token in CASE_MARKERS:
+            # A marker inside a word only recases what follows it, so the
+            # output does not depend on where the buffer was last flushed
+            piece = self._flush_partial() if self._buffer else None
+            self._case = token
+            self._case_first = True
+            return piece
+        if token.endswith(self.END_OF_WORD):
+            self._buffer.append(token[:-len(self.END_OF_WORD)])
+            word = restore_case(self._case, ''.join(self._buffer), self._case_first)
+            self._buffer = []
+            self._case = None
+            return self._emit(word)
+        
+        self._buffer.append(token)
+        if len(self._buffer) >= self.max_buffer_tokens:
+            # Keep memory bounded for runs of ids that never close a word
+            return self._flush_partial()
+        return None
+    
+    def _flush_partial(self) -> Optional[str]:
+        """Write out the unfinished word built so far"""
+        partial = restore_case(self._case, ''.join(self._buffer), self._case_first)
+        self._buffer = []
+        self._case_first = self._case_first and not partial
+        piece = ' ' * self._pending_spaces + partial if self._started else partial
+        self._started = self._started or bool(partial)
+        self._pending_spaces = 0
+        return piece or None
+    
+    def feed(self, token_ids: Union[int, Iterable[int]]) -> List[str]:
+        """Consume one id or a chunk of ids; return the completed pieces"""
+        if isinstance(token_ids, int):
+            token_ids = [token_ids]
+        pieces = []
+        for token_id in token_ids:
+            piece = self.step(token_id)
+            if piece is not None:
+                pieces.append(piece)
+        return pieces
+    
+    def finish(self) -> str:
+        """Flush the unfinished word at the end of the stream and reset"""
+        word = restore_case(self._case, ''.join(self._buffer), self._case_first)
+        piece = self._emit(word) or ''
+        self.reset()
+        return piece
+    
+    def reset(self):
+        """Forget all state so the decoder can be reused for a new stream"""
+        self._buffer = []
+        self._pending_spaces = 0
+        self._started = False
+        self._case = None
+        self._case_first = True
+    
+    def decode_stream(self, token_ids: Iterable[int]) -> Iterator[str]:
+        """Yield text pieces for an iterable of ids as words complete"""
+        for token_id in token_ids:
+            piece = self.step(token_id)
+            if piece is not None:
+                yield piece
+        tail = self.finish()
+        if tail:
+            yield tail
 
 
+class TokenUsage:
+    """Per-token usage counters for a tokenizer, indexed by token id
+    
+    Counts live in a flat array so recording an encode costs one increment
+    per token. snapshot() gives a JSON-serializable copy that each worker
+    process can write out, and merge() adds snapshots together. A lock
+    guards every method, since request threads record while the stats
+    page reads.
+    """
+    
+    def __init__(self, size: int, track_words: bool = False, max_words: int = 100000):
+        self.counts = array('Q', bytes(8 * size))
+        self.track_words = track_words
+        self.max_words = max_words
+        self.words = Counter()  # Input words, for sizing word caches
+        self.calls = 0
+        self._lock = threading.RLock()
+    
+    def _trim_words(self):
+        """Keep word tracking bounded by dropping the rarest words"""
+        if len(self.words) > self.max_words:
+            self.words = Counter(dict(self.words.most_common(self.max_words // 2)))
+    
+    def resize(self, size: int):
+        """Grow the counter array to cover ids below size"""
+        with self._lock:
+            if size > len(self.counts):
+                self.counts.extend(array('Q', bytes(8 * (size - len(self.counts)))))
+    
+    def record(self, token_ids: List[int], text: Optional[str] = None):
+        """Count one encode() result"""
+        if not token_ids:
+            return
+        with self._lock:
+            if max(token_ids) >= len(self.counts):
+                self.resize(max(token_ids) + 1)
+            counts = self.counts
+            for token_id in token_ids:
+                counts[token_id] += 1
+            self.calls += 1
+            if self.track_words and text:
+                self.words.update(text.split())
+                self._trim_words()
+    
+    def reset(self):
+        """Zero all counters"""
+        with self._lock:
+            self.counts = array('Q', bytes(8 * len(self.counts)))
+            self.words.clear()
+            self.calls = 0
+    
+    def snapshot(self) -> Dict:
+        """JSON-serializable copy of the counters"""
+        with self._lock:
+            return {
+                'counts': self.counts.tolist(),
+                'words': dict(self.words),
+                'calls': self.calls,
+            }
+    
+    def merge(self, other: Union['TokenUsage', Dict]):
+        """Add another TokenUsage or snapshot (e.g. from a worker) into this one"""
+        if isinstance(other, TokenUsage):
+            other = other.snapshot()  # Taken before our lock, never holding both
+        other_counts = other['counts']
+        with self._lock:
+            self.resize(len(other_counts))
+            counts = self.counts
+            for token_id, count in enumerate(other_counts):
+                if count:
+                    counts[token_id] += count
+            self.words.update(other.get('words', {}))
+            self._trim_words()
+            self.calls += other.get('calls', 0)
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict) -> 'TokenUsage':
+        """Rebuild counters from a snapshot"""
+        usage = cls(0, track_words=bool(snapshot.get('words')))
+        usage.merge(snapshot)
+        return usage
+    
+    def total(self) -> int:
+        """Total number of tokens counted"""
+        with self._lock:
+            return sum(self.counts)
+    
+    def dead_tokens(self, vocab: Dict[str, int]) -> List[str]:
+        """Vocabulary entries that were never produced"""
+        with self._lock:
+            counts = self.counts
+            return [token for token, token_id in sorted(vocab.items(), key=lambda item: item[1])
+                    if token_id >= len(counts) or counts[token_id] == 0]
+    
+    def hottest_tokens(self, vocab: Dict[str, int], n: int = 20) -> List[Tuple[str, int]]:
+        """Most frequently produced tokens with their counts"""
+        id_to_token = {v: k for k, v in vocab.items()}
+        with self._lock:
+            counts = self.counts
+            top = sorted(range(len(counts)), key=counts.__getitem__, reverse=True)[:n]
+            return [(id_to_token.get(token_id, '<UNK>'), counts[token_id])
+                    for token_id in top if counts[token_id]]
+    
+    def hottest_words(self, n: int = 20) -> List[Tuple[str, int]]:
+        """Most frequent input words with their counts"""
+        with self._lock:
+            return self.words.most_common(n)
+    
+    def histogram(self) -> List[Tuple[str, int]]:
+        """Number of tokens per usage bucket: 0, 1-9, 10-99, ..."""
+        buckets = Counter()
+        with self._lock:
+            for count in self.counts:
+                buckets[len(str(count)) if count else 0] += 1
+        rows = [('0', buckets.pop(0, 0))]
+        for digits in sorted(buckets):
+            low = 10 ** (digits - 1)
+            rows.append((f"{low}-{low * 10 - 1}", buckets[digits]))
+        return rows
@@ -0,0 +1,94 @@
+"""
+Compare BPE training with and without case normalization
+
+Trains one tokenizer on the usual mixed-case corpus and one that lowercases
+words (with case-marker tokens) on a corpus without the lower/UPPER copies,
+then reports training time, vocabulary efficiency and compression ratio on
+the same mixed-case evaluation sample.
+"""
+
+from bpe_tokenizer import BPETokenizer
+from stock_data import generate_stock_corpus
+import argparse
+import contextlib
+import io
+import random
+import time
+
+
+def case_duplicates(tokenizer: BPETokenizer) -> int:
+    """Tokens that differ from another vocabulary entry only by case"""
+    lowered = {}
+    for token in tokenizer.vocab:
+        lowered.setdefault(token.lower(), []).append(token)
+    return sum(len(tokens) - 1 for tokens in lowered.values())
+
+
+def evaluate(name: str, tokenizer: BPETokenizer, corpus, eval_texts, train_seconds: float):
+    """Collect the comparison metrics for one tokenizer"""
+    used = set()
+    round_trips = 0
+    for text in eval_texts:
+        ids = tokenizer.encode(text)
+        used.update(ids)
+        round_trips += tokenizer.decode(ids) == text
+    return {
+        'name': name,
+        'corpus_entries': len(corpus),
+        'unique_words': len(tokenizer.word_freqs),
+        'train_seconds': train_seconds,
+        'vocab': len(tokenizer.vocab),
+        'case_duplicates': case_duplicates(tokenizer),
+        'used_tokens': len(used),
+        'compression': tokenizer.get_compression_ratio(eval_texts),
+        'round_trip': round_trips / len(eval_texts),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare training with and without case normalization")
+    parser.add_argument("--vocab-size", type=int, default=5500)
+    parser.add_argument("--eval-samples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        mixed_corpus = generate_stock_corpus()
+        folded_corpus = generate_stock_corpus(case_variants=False)
+
+    # Evaluate both on the same mixed-case text
+    distinct = sorted(set(mixed_corpus))
+    eval_texts = random.Random(args.seed).sample(distinct, min(args.eval_samples, len(distinct)))
+
+    results = []
+    for name, corpus, case_normalize in (("baseline", mixed_corpus, False),
+                                         ("case-normalized", folded_corpus, True)):
+        print(f"Training {name} tokenizer ({len(corpus)} corpus entries)...")
+        tokenizer = BPETokenizer(vocab_size=args.vocab_size, case_normalize=case_normalize)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            tokenizer.train(corpus)
+        train_seconds = time.perf_counter() - start
+        results.append(evaluate(name, tokenizer, corpus, eval_texts, train_seconds))
+
+    print(f"\n{'='*60}")
+    print(f"Evaluation sample: {len(eval_texts)} mixed-case corpus lines")
+    print(f"{'='*60}")
+    rows = [
+        ("Corpus entries", 'corpus_entries', "{:,}"),
+        ("Unique training words", 'unique_words', "{:,}"),
+        ("Training time (s)", 'train_seconds', "{:.2f}"),
+        ("Vocabulary size", 'vocab', "{:,}"),
+        ("Case-duplicate tokens", 'case_duplicates', "{:,}"),
+        ("Tokens used on sample", 'used_tokens', "{:,}"),
+        ("Compression ratio", 'compression', "{:.2f}"),
+        ("Exact round trips", 'round_trip', "{:.1%}"),
+    ]
+    print(f"{'Metric':<24}" + "".join(f"{r['name']:>18}" for r in results))
+    for label, key, fmt in rows:
+        print(f"{label:<24}" + "".join(f"{fmt.format(r[key]):>18}" for r in results))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Differential fuzz harness for the optimized BPE paths
+
+The regex-based reference implementation (BPETokenizer._apply_bpe and
+train(backend='python')) and reference_decode() define the expected output.
+Randomized inputs built from the stock_data vocabularies, random Unicode
+and punctuation are run through every optimized path, which has to
+reproduce the reference exactly: the same merges and vocab for training,
+the same ids for encode and the same text for decode. Both sides are
+timed in the same run, so every check also reports a speedup.
+"""
+
+from bpe_numpy import HAS_NUMPY
+from bpe_tokenizer import BPETokenizer, StreamingDecoder, CASE_MARKERS, restore_case
+from stock_data import (NSE_SYMBOLS, BSE_CODES, BSE_NAMES, ACTIONS, MARKET_TERMS,
+                        COMPANY_NAMES, FINANCIAL_TERMS, TRADING_TERMS, INDEX_CONSTITUENTS,
+                        generate_stock_corpus, get_ticker_tokens)
+from typing import List, Dict, Callable
+import argparse
+import contextlib
+import io
+import random
+import string
+import time
+
+
+# Codepoint ranges for random characters: accented Latin, Devanagari,
+# currency symbols, CJK, emoji and combining marks
+UNICODE_RANGES = [
+    (0x00C0, 0x024F),
+    (0x0900, 0x097F),
+    (0x20A0, 0x20C0),
+    (0x4E00, 0x4FFF),
+    (0x1F300, 0x1F64F),
+    (0x0300, 0x036F),
+]
+# Word separators, including the Unicode spaces str.split() also splits on
+SEPARATORS = [' ', ' ', ' ', '  ', '\t', '\n', '\u00a0', '\u2003', '\u3000', '\x1c']
+
+
+class FuzzInputs:
+    """Seeded generator of words, texts and corpora for the checks"""
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        words = set()
+        for terms in (NSE_SYMBOLS, BSE_CODES, BSE_NAMES, ACTIONS, MARKET_TERMS,
+                      COMPANY_NAMES, FINANCIAL_TERMS, TRADING_TERMS, INDEX_CONSTITUENTS):
+            for term in terms:
+                words.update(term.split())
+        self.stock_words = sorted(words)
+
+    def random_char(self) -> str:
+        """One character from punctuation, the Unicode ranges or anywhere in the BMP"""
+        roll = self.rng.random()
+        if roll < 0.4:
+            return self.rng.choice(string.punctuation)
+        if roll < 0.9:
+            low, high = self.rng.choice(UNICODE_RANGES)
+            return chr(self.rng.randint(low, high))
+        char = chr(self.rng.randint(0x21, 0xFFFF))
+        # Surrogates cannot be encoded and whitespace would split the word
+        return '?' if 0xD800 <= ord(char) <= 0xDFFF or char.isspace() else char
+
+    def word(self) -> str:
+        """A stock term, usually recased and sometimes mutated"""
+        rng = self.rng
+        if rng.random() < 0.1:
+            return ''.join(self.random_char() for _ in range(rng.randint(1, 8)))
+        word = rng.choice(self.stock_words)
+        word = rng.choice([str.lower, str.upper, str.title, str.swapcase,
+                           lambda w: w, lambda w: w])(word)
+        roll = rng.random()
+        if roll < 0.15:
+            # Glue on punctuation or a random character
+            index = rng.randint(0, len(word))
+            word = word[:index] + self.random_char() + word[index:]
+        elif roll < 0.25:
+            word += rng.choice(self.stock_words)  # Splice two terms together
+        elif roll < 0.3:
+            word = word * rng.randint(2, 4)  # Repeats exercise runs of equal pairs
+        return word
+
+    def text(self, max_words: int = 20) -> str:
+        """Words joined by random separators; occasionally a long document"""
+        rng = self.rng
+        count = rng.randint(200, 1000) if rng.random() < 0.02 else rng.randint(0, max_words)
+        parts = [rng.choice(SEPARATORS) if rng.random() < 0.1 else '']
+        for _ in range(count):
+            parts.append(self.word())
+            parts.append(rng.choice(SEPARATORS))
+        return ''.join(parts)
+
+    def corpus(self, lines: int) -> List[str]:
+        """Training lines with stock-like repetition so merges have winners"""
+        pool = [self.text(6) for _ in range(max(1, lines // 3))]
+        return [self.rng.choice(pool) for _ in range(lines)]
+
+    def ids(self, tokenizer: BPETokenizer, max_len: int = 40) -> List[int]:
+        """Random ids, including some the vocabulary does not contain"""
+        top = max(tokenizer.vocab.values(), default=0)
+        return [self.rng.randint(0, top + 10) for _ in range(self.rng.randint(0, max_len))]
+
+
+def compare(name: str, cases: list, reference: Callable, optimized: Callable,
+            max_examples: int = 5) -> Dict:
+    """Run both implementations over the cases, timing each and collecting mismatches"""
+    start = time.perf_counter()
+    expected = [reference(case) for case in cases]
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [optimized(case) for case in cases]
+    optimized_seconds = time.perf_counter() - start
+
+    mismatches = [(case, want, got)
+                  for case, want, got in zip(cases, expected, actual) if want != got]
+    return {
+        'name': name,
+        'cases': len(cases),
+        'mismatches': len(mismatches),
+        'examples': mismatches[:max_examples],
+        'reference_seconds': reference_seconds,
+        'optimized_seconds': optimized_seconds,
+        'speedup': reference_seconds / optimized_seconds if optimized_seconds else float('inf'),
+    }
+
+
+def train_quietly(corpus: List[str], vocab_size: int, case_normalize: bool,
+                  backend: str) -> BPETokenizer:
+    """Train without the progress output"""
+    tokenizer = BPETokenizer(vocab_size=vocab_size, case_normalize=case_normalize)
+    with contextlib.redirect_stdout(io.StringIO()):
+        tokenizer.train(corpus, backend=backend)
+    return tokenizer
+
+
+def check_train(inputs: FuzzInputs, trials: int, lines: int, merges: int) -> Dict:
+    """NumPy training backend vs the pure-Python reference loop"""
+    cases = []
+    for _ in range(trials):
+        corpus = inputs.corpus(lines)
+        case_normalize = inputs.rng.random() < 0.5
+        # Enough headroom over the base characters for roughly `merges` merges
+        base = {char for line in corpus for char in line if not char.isspace()}
+        cases.append((corpus, len(base) + 3 + merges, case_normalize))
+
+    def learned(backend):
+        def run(case):
+            tokenizer = train_quietly(*case, backend=backend)
+            return [tuple(pair) for pair, _ in tokenizer.merges], tokenizer.vocab
+        return run
+
+    return compare('train: numpy vs python', cases, learned('python'), learned('numpy'))
+
+
+def check_encode(name: str, tokenizer: BPETokenizer, texts: List[str]) -> Dict:
+    """Ranked merge lookup vs applying every merge regex in turn"""
+    def encode_with(backend):
+        def run(text):
+            tokenizer.encode_backend = backend
+            return tokenizer.encode(text)
+        return run
+
+    try:
+        return compare(f'encode ({name}): ranked vs regex', texts,
+                       encode_with('regex'), encode_with('ranked'))
+    finally:
+        tokenizer.encode_backend = 'regex'
+
+
+def reference_decode(tokenizer: BPETokenizer, id_to_token: Dict[int, str],
+                     token_ids: List[int]) -> str:
+    """Whole-list decode written independently of StreamingDecoder
+
+    decode() delegates to StreamingDecoder for case-normalized tokenizers,
+    so it cannot serve as the reference there. This joins the tokens the way
+    the original decode() does and applies each case marker to the pieces
+    that follow it, up to the end of the word.
+    """
+    pieces = []
+    case, first = None, True
+    for token_id in token_ids:
+        token = id_to_token.get(token_id, '<UNK>')
+        if tokenizer.case_normalize and token in CASE_MARKERS:
+            case, first = token, True
+            continue
+        end_of_word = token.endswith('</w>')
+        text = token[:-len('</w>')] if end_of_word else token
+        pieces.append(restore_case(case, text, first))
+        first = first and not text
+        if end_of_word:
+            pieces.append(' ')
+            case, first = None, True
+    return ''.join(pieces).strip()
+
+
+def check_decode(name: str, tokenizer: BPETokenizer, inputs: FuzzInputs,
+                 id_lists: List[List[int]]) -> List[Dict]:
+    """decode() and StreamingDecoder fed in random chunks vs reference_decode()"""
+    id_to_token = {v: k for k, v in tokenizer.vocab.items()}
+    cases = [(ids, inputs.rng.randint(1, 8), inputs.rng.randint(1, 5)) for ids in id_lists]
+
+    def streamed(case):
+        ids, max_buffer_tokens, chunk = case
+        decoder = StreamingDecoder(tokenizer, max_buffer_tokens=max_buffer_tokens,
+                                   id_to_token=id_to_token)
+        pieces = []
+        for i in range(0, len(ids), chunk):
+            pieces.extend(decoder.feed(ids[i:i + chunk]))
+        pieces.append(decoder.finish())
+        return ''.join(pieces)
+
+    def reference(case):
+        return reference_decode(tokenizer, id_to_token, case[0])
+
+    return [
+        compare(f'decode ({name}): decode() vs reference', cases,
+                reference, lambda case: tokenizer.decode(case[0])),
+        compare(f'decode ({name}): streaming vs reference', cases, reference, streamed),
+    ]
+
+
+def build_tokenizers(vocab_size: int, tokenizer_path: str = None) -> Dict[str, BPETokenizer]:
+    """Plain and case-normalized tokenizers (with ticker tokens) on the stock corpus"""
+    if tokenizer_path:
+        tokenizer = BPETokenizer()
+        tokenizer.load(tokenizer_path)
+        return {tokenizer_path: tokenizer}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        mixed_corpus = generate_stock_corpus()
+        folded_corpus = generate_stock_corpus(case_variants=False)
+    plain = train_quietly(mixed_corpus, vocab_size, False, 'auto')
+    folded = train_quietly(folded_corpus, vocab_size, True, 'auto')
+    folded.add_tokens(get_ticker_tokens())
+    return {'plain': plain, 'case-normalized+tickers': folded}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fuzz optimized BPE paths against the reference")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--texts", type=int, default=500, help="Random texts per tokenizer")
+    parser.add_argument("--vocab-size", type=int, default=2000)
+    parser.add_argument("--tokenizer", help="Check a saved tokenizer instead of training two")
+    parser.add_argument("--train-trials", type=int, default=20, help="Random corpora to train on")
+    parser.add_argument("--train-lines", type=int, default=300)
+    parser.add_argument("--train-merges", type=int, default=150)
+    args = parser.parse_args(argv)
+
+    inputs = FuzzInputs(args.seed)
+    results = []
+
+    if HAS_NUMPY:
+        print(f"Training on {args.train_trials} random corpora with both backends...")
+        results.append(check_train(inputs, args.train_trials, args.train_lines, args.train_merges))
+    else:
+        print("NumPy not installed: skipping the training backend check")
+
+    print("Preparing tokenizers...")
+    for name, tokenizer in build_tokenizers(args.vocab_size, args.tokenizer).items():
+        texts = [inputs.text() for _ in range(args.texts)]
+        print(f"Checking {name} tokenizer on {len(texts)} random texts...")
+        results.append(check_encode(name, tokenizer, texts))
+        id_lists = [tokenizer.encode(text) for text in texts]
+        id_lists += [inputs.ids(tokenizer) for _ in range(len(texts))]
+        results.extend(check_decode(name, tokenizer, inputs, id_lists))
+
+    print(f"\n{'='*86}")
+    print(f"{'Check':<56}{'Cases':>7}{'Mismatch':>10}{'Speedup':>11}")
+    print(f"{'='*86}")
+    for result in results:
+        print(f"{result['name']:<56}{result['cases']:>7}{result['mismatches']:>10}"
+              f"{result['speedup']:>10.2f}x")
+    for result in results:
+        for case, want, got in result['examples']:
+            print(f"\n✗ {result['name']}\n  input:    {case!r:.300}"
+                  f"\n  expected: {want!r:.300}\n  got:      {got!r:.300}")
+
+    identical = all(result['mismatches'] == 0 for result in results)
+    print(f"\n{'✓ All optimized paths match the reference' if identical else '✗ MISMATCHES FOUND'}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,67 +3,475 @@ Data collection for Indian stock market (NSE and BSE)
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 import csv
-from typing import List
+import hashlib
+import inspect
+import io
+import json
+import os
+import threading
+from typing import List, Dict, Optional, Tuple
 import time
 
 
-def get_nse_stocks() -> List[str]:
+# NSE stock list - using known NSE stocks
+# In production, you would fetch from NSE API or official sources
+NSE_SYMBOLS = [
+    "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK",
+    "BHARTIARTL", "SBIN", "BAJFINANCE", "LICI", "ITC", "LT", "HCLTECH",
+    "AXISBANK", "KOTAKBANK", "ASIANPAINT", "MARUTI", "TITAN", "ULTRACEMCO",
+    "SUNPHARMA", "NTPC", "ONGC", "NESTLEIND", "POWERGRID", "M&M", "TATASTEEL",
+    "ADANIENT", "JSWSTEEL", "WIPRO", "HINDALCO", "COALINDIA", "TECHM",
+    "GRASIM", "DIVISLAB", "BAJAJFINSV", "TATAMOTORS", "CIPLA", "SBILIFE",
+    "DRREDDY", "EICHERMOT", "HEROMOTOCO", "BRITANNIA", "BPCL", "IOC",
+    "INDUSINDBK", "ADANIPORTS", "APOLLOHOSP", "TATACONSUM", "BAJAJ-AUTO",
+    "MARICO", "VEDL", "GODREJCP", "PIDILITIND", "DABUR", "HAVELLS",
+    "SHREECEM", "AMBUJACEM", "BANKBARODA", "ZOMATO", "ICICIPRULI", "LTI",
+    "TORNTPHARM", "GODREJPROP", "DLF", "CANBK", "BIOCON", "ICICIGI",
+    "INDIGO", "NAUKRI", "MCDOWELL-N", "HDFCLIFE", "BERGEPAINT", "SBICARD",
+    "PGHH", "MOTHERSON", "TATAPOWER", "BEL", "UNIONBANK", "HAL", "BATAINDIA",
+    "IOB", "PNB", "CENTRALBK", "UCOBANK", "IDFCFIRSTB", "FEDERALBNK",
+    "BANKINDIA", "YESBANK", "RBLBANK", "AUBANK", "CSBBANK", "KARURVYSYA",
+    "SOUTHBANK", "DCBBANK", "JKLAKSHMI", "ORIENTBANK", "DCMSHRIRAM",
+    "RADICO", "GRAPHITE", "EVERESTIND", "RAJESHEXPO", "SHILPAMED", "GILLETTE",
+    "HEXAWARE", "WIPRO", "MINDTREE", "LTI", "MPHASIS", "TECHM", "ZENSAR",
+    "CYIENT", "LTTS", "PERSISTENT", "KPITTECH", "SONATA", "NEWGEN", "ROHLTD",
+    "RAMSARUP", "CENTURYPLY", "GREENPLY", "RUSHIL", "STYLAM", "SHRIRAMFIN",
+    "BAJAJFINSV", "MUTHOOTFIN", "MANAPPURAM", "LICHSGFIN", "RELIANCE",
+    "ADANIENT", "ADANIPORTS", "ADANIGREEN", "ADANIPOWER", "ADANITRANS",
+    "ADANIWILMAR", "ALKEM", "APLLTD", "ASTRAL", "AUBANK", "BAJAJHLDNG",
+    "BALKRISIND", "BANDHANBNK", "BANKBARODA", "BEL", "BHARATFORG", "BHEL",
+    "BIOCON", "BOSCHLTD", "BPCL", "BRITANNIA", "CADILAHC", "CANBK",
+    "CHOLAFIN", "CIPLA", "COALINDIA", "COFORGE", "CONCOR", "CUMMINSIND",
+    "DABUR", "DALBHARAT", "DEEPAKNTR", "DIVISLAB", "DLF", "DRREDDY",
+    "EICHERMOT", "ESCORTS", "EXIDEIND", "FEDERALBNK", "GAIL", "GLENMARK",
+    "GODREJCP", "GODREJPROP", "GRASIM", "GUJGASLTD", "HAVELLS", "HCLTECH",
+    "HDFCAMC", "HDFCBANK", "HDFCLIFE", "HEROMOTOCO", "HINDALCO", "HINDPETRO",
+    "HINDUNILVR", "ICICIBANK", "ICICIGI", "ICICIPRULI", "IDEA", "IDFCFIRSTB",
+    "IEX", "IGL", "INDIGO", "INDUSINDBK", "INFRATEL", "INFY", "IOC",
+    "IPCALAB", "ITC", "JINDALSAW", "JKCEMENT", "JSWSTEEL", "JUBLFOOD",
+    "KOTAKBANK", "L&TFH", "LICHSGFIN", "LT", "LTI", "LTTS", "LUPIN",
+    "M&M", "M&MFIN", "MANAPPURAM", "MARICO", "MARUTI", "MCDOWELL-N",
+    "MCX", "METROPOLIS", "MFSL", "MGL", "MINDTREE", "MPHASIS", "MRF",
+    "MUTHOOTFIN", "NAM-INDIA", "NAUKRI", "NAZARA", "NESTLEIND", "NMDC",
+    "NTPC", "OBEROIRLTY", "OFSS", "ONGC", "PAGEIND", "PAGEIND", "PEL",
+    "PETRONET", "PFC", "PIDILITIND", "PIIND", "PNB", "POLICYBZR", "POWERGRID",
+    "PVR", "RAMCOCEM", "RBLBANK", "RECLTD", "RELIANCE", "SAIL", "SBILIFE",
+    "SBIN", "SHREECEM", "SIEMENS", "SRF", "SRTRANSFIN", "SUNPHARMA",
+    "SUNTV", "TATACHEM", "TATACONSUM", "TATAMOTORS", "TATAPOWER", "TATASTEEL",
+    "TECHM", "TITAN", "TORNTPHARM", "TRENT", "TVSMOTOR", "UBL", "ULTRACEMCO",
+    "UPL", "VEDL", "VOLTAS", "WIPRO", "ZEEL", "ZOMATO", "ZYDUSLIFE"
+]
+
+# BSE stock list - using known BSE stocks
+BSE_CODES = [
+    "500325", "500209", "500180", "500675", "500696", "500112", "532174",
+    "500010", "532755", "532540", "500570", "532187", "500295", "500247",
+    "500300", "500440", "532977", "500103", "532538", "500087", "500104",
+    "500470", "500124", "532461", "500253", "500114", "500106", "532222",
+    "532868", "500116", "500124", "500119", "500139", "500125", "500182",
+    "500103", "500087", "500124", "500253", "500114", "500106", "532222",
+    "532868", "500116", "500325", "500209", "500180", "500675", "500696",
+    "500112", "532174", "500010", "532755", "532540", "500570", "532187",
+    "500295", "500247", "500300", "500440", "532977", "532538", "532461"
+]
+
+# Company names that correspond to BSE codes
+BSE_NAMES = [
+    "RELIANCE", "TCS", "HDFC BANK", "INFOSYS", "HUL", "ICICI BANK",
+    "BHARTI AIRTEL", "SBI", "BAJAJ FINANCE", "LIC", "ITC", "LARSEN",
+    "HCL TECH", "AXIS BANK", "KOTAK MAHINDRA", "ASIAN PAINTS", "MARUTI",
+    "TITAN", "ULTRATECH", "SUN PHARMA", "NTPC", "ONGC", "NESTLE",
+    "POWER GRID", "M&M", "TATA STEEL", "ADANI ENTERPRISES", "JSW STEEL",
+    "WIPRO", "HINDALCO", "COAL INDIA", "TECH MAHINDRA", "GRASIM",
+    "DIVI'S LAB", "BAJAJ FINSERV", "TATA MOTORS", "CIPLA", "SBI LIFE",
+    "DR REDDY", "EICHER MOTORS", "HERO MOTOCORP", "BRITANNIA", "BPCL",
+    "IOC", "INDUSIND BANK", "ADANI PORTS", "APOLLO HOSPITALS", "TATA CONSUMER",
+    "BAJAJ AUTO", "MARICO", "VEDANTA", "GODREJ CONSUMER", "PIDILITE",
+    "DABUR", "HAVELLS", "SHREE CEMENT", "AMBuja CEMENT", "BANK OF BARODA"
+]
+
+# Actions for patterns like "Buy RELIANCE", "Sell TCS", etc.
+ACTIONS = ["Buy", "Sell", "Hold", "Trade", "Invest", "Stock", "Share", 
+           "Equity", "Security", "Instrument", "Listing", "IPO", "FPO",
+           "Purchase", "Acquire", "Dispose", "Transfer", "Allocate",
+           "Portfolio", "Position", "Long", "Short", "Call", "Put",
+           "Option", "Future", "Derivative", "Contract", "Expiry",
+           "Strike", "Premium", "Volume", "Liquidity", "Volatility"]
+
+# Market-related terms
+MARKET_TERMS = [
+    "National Stock Exchange", "NSE", "Bombay Stock Exchange", "BSE",
+    "Sensex", "Nifty", "Nifty 50", "Nifty 500", "Nifty Next 50",
+    "Nifty Midcap", "Nifty Smallcap", "Nifty Bank", "Nifty IT",
+    "Nifty Pharma", "Nifty Auto", "Nifty FMCG", "Nifty Metal",
+    "Nifty Energy", "Nifty Realty", "Nifty PSU Bank", "Nifty Private Bank",
+    "Midcap", "Smallcap", "Largecap", "Megacap", "Microcap",
+    "Market Cap", "Market Capitalization", "Free Float Market Cap",
+    "Volume", "Trading Volume", "Average Volume", "Volume Weighted",
+    "Price", "Current Price", "Closing Price", "Opening Price",
+    "High", "Day High", "52 Week High", "All Time High",
+    "Low", "Day Low", "52 Week Low", "All Time Low",
+    "Open", "Close", "Last Traded Price", "Bid Price", "Ask Price",
+    "Dividend", "Dividend Yield", "Dividend Per Share", "Ex-Dividend",
+    "PE Ratio", "Price to Earnings", "Trailing PE", "Forward PE",
+    "PB Ratio", "Price to Book", "Price to Sales", "PS Ratio",
+    "ROE", "Return on Equity", "ROCE", "Return on Capital Employed",
+    "ROA", "Return on Assets", "EPS", "Earnings Per Share",
+    "Diluted EPS", "Basic EPS", "Revenue", "Total Revenue",
+    "Net Revenue", "Operating Revenue", "Profit", "Net Profit",
+    "Gross Profit", "Operating Profit", "EBITDA", "EBIT",
+    "Free Float", "Index Weight", "Sector Weight", "Stock Weight",
+    "Sector", "Industry", "Sub Industry", "Industry Classification",
+    "Financial Services", "Banking", "Private Bank", "Public Bank",
+    "NBFC", "Insurance", "Life Insurance", "General Insurance",
+    "Technology", "IT Services", "Software", "Hardware",
+    "Pharmaceuticals", "Pharma", "Biotech", "Healthcare",
+    "FMCG", "Fast Moving Consumer Goods", "Consumer Goods",
+    "Automobile", "Auto", "Auto Ancillary", "Two Wheeler",
+    "Four Wheeler", "Commercial Vehicle", "Passenger Vehicle",
+    "Oil & Gas", "Oil", "Gas", "Refining", "Exploration",
+    "Power", "Power Generation", "Power Transmission", "Power Distribution",
+    "Metals", "Steel", "Aluminum", "Copper", "Iron", "Gold",
+    "Cement", "Building Materials", "Construction Materials",
+    "Real Estate", "Construction", "Infrastructure", "Engineering",
+    "Telecom", "Telecommunications", "Mobile Services", "Broadband",
+    "Media", "Entertainment", "Broadcasting", "Print Media",
+    "Retail", "E-commerce", "Consumer Services", "Hospitality",
+    "Healthcare", "Hospitals", "Diagnostics", "Medical Devices",
+    "Chemicals", "Specialty Chemicals", "Petrochemicals",
+    "Textiles", "Garments", "Apparel", "Fashion",
+    "Agriculture", "Agri Business", "Fertilizers", "Pesticides",
+    "Shipping", "Logistics", "Transportation", "Aviation",
+    "Ports", "Airports", "Roads", "Highways"
+]
+
+# Company names and tickers together
+COMPANY_NAMES = [
+    "Reliance Industries", "Reliance", "RIL",
+    "Tata Consultancy Services", "TCS", "Tata CS",
+    "HDFC Bank", "HDFC", "HDFC Bank Limited",
+    "Infosys", "Infosys Limited", "Infosys Technologies",
+    "Hindustan Unilever", "HUL", "Hindustan Unilever Limited",
+    "ICICI Bank", "ICICI", "ICICI Bank Limited",
+    "Bharti Airtel", "Airtel", "Bharti",
+    "State Bank of India", "SBI", "State Bank",
+    "Bajaj Finance", "Bajaj Finserv", "Bajaj",
+    "Life Insurance Corporation", "LIC", "LIC of India",
+    "ITC Limited", "ITC", "Indian Tobacco Company",
+    "Larsen & Toubro", "L&T", "L and T", "Larsen Toubro",
+    "HCL Technologies", "HCL", "HCL Tech",
+    "Axis Bank", "Axis", "Axis Bank Limited",
+    "Kotak Mahindra Bank", "Kotak Bank", "Kotak",
+    "Asian Paints", "Asian", "Asian Paints Limited",
+    "Maruti Suzuki", "Maruti", "Maruti Suzuki India",
+    "Titan Company", "Titan", "Titan Industries",
+    "UltraTech Cement", "UltraTech", "Ultra Tech",
+    "Sun Pharmaceutical", "Sun Pharma", "Sun",
+    "NTPC", "National Thermal Power Corporation",
+    "Oil and Natural Gas", "ONGC", "Oil Natural Gas",
+    "Nestle India", "Nestle", "Nestle India Limited",
+    "Power Grid Corporation", "PowerGrid", "PGCIL",
+    "Mahindra & Mahindra", "M&M", "Mahindra",
+    "Tata Steel", "Tata Steel Limited", "TSL",
+    "Adani Enterprises", "Adani", "Adani Group",
+    "JSW Steel", "JSW", "JSW Steel Limited",
+    "Wipro", "Wipro Limited", "Wipro Technologies",
+    "Hindalco", "Hindalco Industries", "Hindalco Limited",
+    "Coal India", "CIL", "Coal India Limited",
+    "Tech Mahindra", "TechM", "Tech Mahindra Limited",
+    "Grasim Industries", "Grasim", "Grasim Limited",
+    "Divi's Laboratories", "Divi Labs", "Divi",
+    "Tata Motors", "TML", "Tata Motors Limited",
+    "Cipla", "Cipla Limited", "Cipla India",
+    "SBI Life Insurance", "SBI Life", "SBI Life Insurance Company",
+    "Dr Reddy's Laboratories", "Dr Reddy", "DRL",
+    "Eicher Motors", "Eicher", "Eicher Motors Limited",
+    "Hero MotoCorp", "Hero", "Hero Honda",
+    "Britannia Industries", "Britannia", "Britannia Limited",
+    "Bharat Petroleum", "BPCL", "BP",
+    "Indian Oil Corporation", "IOC", "Indian Oil"
+]
+
+# Financial metrics and ratios
+FINANCIAL_TERMS = [
+    "Balance Sheet", "Profit and Loss", "P&L", "Cash Flow",
+    "Annual Report", "Quarterly Results", "Earnings Report",
+    "Market Share", "Revenue Growth", "Profit Growth",
+    "Margin", "Operating Margin", "Net Margin", "Gross Margin",
+    "Debt", "Total Debt", "Net Debt", "Debt to Equity",
+    "Current Ratio", "Quick Ratio", "Debt Ratio",
+    "Asset Turnover", "Inventory Turnover", "Receivables Turnover",
+    "Working Capital", "Current Assets", "Current Liabilities",
+    "Fixed Assets", "Intangible Assets", "Goodwill",
+    "Shareholders Equity", "Book Value", "Market Value",
+    "Beta", "Alpha", "Standard Deviation", "Variance",
+    "CAGR", "Compound Annual Growth Rate", "YOY", "Year on Year",
+    "QOQ", "Quarter on Quarter", "MOM", "Month on Month",
+    "Promoter Holding", "Public Holding", "FII Holding", "DII Holding",
+    "Foreign Institutional Investor", "Domestic Institutional Investor",
+    "Mutual Fund", "ETF", "Exchange Traded Fund", "Index Fund",
+    "Active Fund", "Passive Fund", "Hedge Fund", "Pension Fund"
+]
+
+# Trading terms
+TRADING_TERMS = [
+    "Market Order", "Limit Order", "Stop Loss", "Take Profit",
+    "Day Order", "GTC Order", "IOC Order", "FOK Order",
+    "Bulk Deal", "Block Deal", "Insider Trading", "Circuit Breaker",
+    "Upper Circuit", "Lower Circuit", "Price Band", "Freeze",
+    "Suspended", "Delisted", "Listed", "IPO", "FPO", "OFS",
+    "Offer for Sale", "Buyback", "Bonus Issue", "Stock Split",
+    "Right Issue", "Preferential Allotment", "Qualified Placement",
+    "Demat", "Dematerialization", "Remat", "Rematerialization",
+    "Trading Account", "Demat Account", "Bank Account", "KYC",
+    "Know Your Customer", "PAN", "Aadhaar", "GST", "TDS"
+]
+
+# Index constituents (sample)
+INDEX_CONSTITUENTS = [
+    "Nifty 50 Constituents", "Sensex 30 Constituents",
+    "Nifty Next 50 Constituents", "Nifty Midcap 150",
+    "Nifty Smallcap 250", "Nifty 500 Constituents",
+    "Nifty Bank Index", "Nifty IT Index", "Nifty Pharma Index",
+    "Nifty Auto Index", "Nifty FMCG Index", "Nifty Metal Index"
+]
+
+# Sentence templates used to build phrases around each stock
+PHRASE_TEMPLATES = [
+    "{stock} stock price",
+    "{stock} share price",
+    "{stock} current price",
+    "{stock} market cap",
+    "{stock} PE ratio",
+    "{stock} dividend yield",
+    "{stock} 52 week high",
+    "{stock} 52 week low",
+    "{stock} volume",
+    "{stock} on NSE",
+    "{stock} on BSE",
+    "Buy {stock}",
+    "Sell {stock}",
+    "Hold {stock}",
+    "{stock} analysis",
+    "{stock} news",
+    "{stock} results",
+    "{stock} earnings"
+]
+
+# Repeat corpus multiple times to increase frequency of patterns
+# This helps BPE learn better tokenizations and reach higher vocab sizes
+CORPUS_REPETITIONS = 15
+
+# Live symbol list sources. Base URLs are configurable so a local stub server
+# can stand in for the exchanges.
+NSE_BASE_URL = "https://archives.nseindia.com"
+BSE_BASE_URL = "https://api.bseindia.com"
+NSE_LIST_PATHS = [
+    "/content/equities/EQUITY_L.csv",  # Main board equities
+    "/emerge/corporates/content/SME_EQUITY_L.csv",  # SME (Emerge) platform
+]
+BSE_LIST_PATHS = [
+    "/BseIndiaAPI/api/ListofScripData/w?Group=&Scripcode=&industry=&segment=Equity&status=Active",
+]
+FETCH_HEADERS = {
+    # The exchanges reject requests without a browser-like user agent
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko)",
+    "Accept": "*/*",
+}
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing requests at least 1/rate seconds apart"""
+    
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self):
+        """Block until the caller may issue its next request"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class SymbolFetcher:
+    """Fetch NSE/BSE symbol lists over a pooled session with an on-disk cache"""
+    
+    def __init__(self, nse_base_url: str = NSE_BASE_URL, bse_base_url: str = BSE_BASE_URL,
+                 cache_dir: str = ".symbol_cache", max_workers: int = 4,
+                 requests_per_second: float = 2.0, max_retries: int = 3,
+                 timeout: float = 15.0, session: Optional[requests.Session] = None):
+        self.nse_base_url = nse_base_url.rstrip('/')
+        self.bse_base_url = bse_base_url.rstrip('/')
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.session = session or self._build_session(max_workers, max_retries)
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def _build_session(max_workers: int, max_retries: int) -> requests.Session:
+        """Session whose connection pool matches the worker count, with retries"""
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(FETCH_HEADERS)
+        return session
+    
+    def _cache_paths(self, url: str) -> Tuple[str, str]:
+        """Body and metadata file locations for a URL"""
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, digest)
+        return base + ".body", base + ".json"
+    
+    def _read_cache(self, url: str) -> Tuple[Optional[bytes], Dict]:
+        """Return the cached body and validators for a URL, if any"""
+        body_path, meta_path = self._cache_paths(url)
+        if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+            return None, {}
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+        return body, meta
+    
+    def _write_cache(self, url: str, body: bytes, meta: Dict):
+        """Store a response body and its validators atomically"""
+        body_path, meta_path = self._cache_paths(url)
+        for path, data, mode in ((body_path, body, 'wb'),
+                                 (meta_path, json.dumps(meta), 'w')):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, mode) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+    
+    def fetch(self, url: str) -> bytes:
+        """GET a URL, revalidating any cached copy with ETag/If-Modified-Since"""
+        cached_body, meta = self._read_cache(url)
+        headers = {}
+        if cached_body is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        
+        self.rate_limiter.wait()
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            if cached_body is not None:
+                print(f"Fetch failed for {url} ({e}); using cached copy")
+                return cached_body
+            raise
+        
+        if response.status_code == 304:
+            if cached_body is not None:
+                return cached_body
+            # Nothing to revalidate: caching the empty body would look like an empty listing
+            raise requests.HTTPError(f"304 Not Modified for {url} without a cached copy",
+                                     response=response)
+        response.raise_for_status()
+        
+        self._write_cache(url, response.content, {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        })
+        return response.content
+    
+    def fetch_many(self, urls: List[str]) -> Dict[str, bytes]:
+        """Fetch several URLs concurrently over the shared session"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            bodies = executor.map(self.fetch, urls)
+            return dict(zip(urls, bodies))
+    
+    def fetch_nse_symbols(self) -> List[Tuple[str, str]]:
+        """Return (symbol, company name) pairs from the NSE equity lists"""
+        urls = [self.nse_base_url + path for path in NSE_LIST_PATHS]
+        symbols = []
+        for url, body in self.fetch_many(urls).items():
+            symbols.extend(parse_nse_equity_list(body))
+        print(f"Fetched {len(symbols)} NSE listings")
+        return symbols
+    
+    def fetch_bse_symbols(self) -> List[Tuple[str, str]]:
+        """Return (scrip code, company name) pairs from the BSE scrip lists"""
+        urls = [self.bse_base_url + path for path in BSE_LIST_PATHS]
+        scrips = []
+        for url, body in self.fetch_many(urls).items():
+            scrips.extend(parse_bse_scrip_list(body))
+        print(f"Fetched {len(scrips)} BSE listings")
+        return scrips
+
+
+def parse_nse_equity_list(body: bytes) -> List[Tuple[str, str]]:
+    """Parse an NSE EQUITY_L.csv style listing into (symbol, name) pairs"""
+    reader = csv.DictReader(io.StringIO(body.decode('utf-8-sig')))
+    rows = []
+    for row in reader:
+        row = {(k or '').strip().upper(): (v or '').strip() for k, v in row.items()}
+        if row.get('SYMBOL'):
+            rows.append((row['SYMBOL'], row.get('NAME OF COMPANY', '')))
+    return rows
+
+
+def parse_bse_scrip_list(body: bytes) -> List[Tuple[str, str]]:
+    """Parse a BSE ListofScripData JSON response into (code, name) pairs"""
+    data = json.loads(body.decode('utf-8-sig'))
+    if isinstance(data, dict):
+        data = data.get('Table', [])
+    rows = []
+    for item in data:
+        code = str(item.get('SCRIP_CD', '')).strip()
+        name = (item.get('Issuer_Name') or item.get('Scrip_Name') or '').strip()
+        if code:
+            rows.append((code, name))
+    return rows
+
+
+def fetch_live_symbols(fetcher: Optional[SymbolFetcher] = None) -> Dict[str, List[str]]:
+    """Fetch current NSE/BSE listings in the shape generate_stock_corpus accepts"""
+    fetcher = fetcher or SymbolFetcher()
+    nse = fetcher.fetch_nse_symbols()
+    bse = fetcher.fetch_bse_symbols()
+    return {
+        'nse_symbols': sorted({symbol for symbol, _ in nse}),
+        'bse_codes': sorted({code for code, _ in bse}),
+        'bse_names': sorted({name.upper() for _, name in bse if name}),
+    }
+
+
+def get_nse_stocks(symbols: Optional[List[str]] = None) -> List[str]:
     """Fetch NSE stock symbols"""
     print("Fetching NSE stock data...")
     
-    # NSE stock list - using known NSE stocks
-    # In production, you would fetch from NSE API or official sources
-    nse_stocks = [
-        "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK",
-        "BHARTIARTL", "SBIN", "BAJFINANCE", "LICI", "ITC", "LT", "HCLTECH",
-        "AXISBANK", "KOTAKBANK", "ASIANPAINT", "MARUTI", "TITAN", "ULTRACEMCO",
-        "SUNPHARMA", "NTPC", "ONGC", "NESTLEIND", "POWERGRID", "M&M", "TATASTEEL",
-        "ADANIENT", "JSWSTEEL", "WIPRO", "HINDALCO", "COALINDIA", "TECHM",
-        "GRASIM", "DIVISLAB", "BAJAJFINSV", "TATAMOTORS", "CIPLA", "SBILIFE",
-        "DRREDDY", "EICHERMOT", "HEROMOTOCO", "BRITANNIA", "BPCL", "IOC",
-        "INDUSINDBK", "ADANIPORTS", "APOLLOHOSP", "TATACONSUM", "BAJAJ-AUTO",
-        "MARICO", "VEDL", "GODREJCP", "PIDILITIND", "DABUR", "HAVELLS",
-        "SHREECEM", "AMBUJACEM", "BANKBARODA", "ZOMATO", "ICICIPRULI", "LTI",
-        "TORNTPHARM", "GODREJPROP", "DLF", "CANBK", "BIOCON", "ICICIGI",
-        "INDIGO", "NAUKRI", "MCDOWELL-N", "HDFCLIFE", "BERGEPAINT", "SBICARD",
-        "PGHH", "MOTHERSON", "TATAPOWER", "BEL", "UNIONBANK", "HAL", "BATAINDIA",
-        "IOB", "PNB", "CENTRALBK", "UCOBANK", "IDFCFIRSTB", "FEDERALBNK",
-        "BANKINDIA", "YESBANK", "RBLBANK", "AUBANK", "CSBBANK", "KARURVYSYA",
-        "SOUTHBANK", "DCBBANK", "JKLAKSHMI", "ORIENTBANK", "DCMSHRIRAM",
-        "RADICO", "GRAPHITE", "EVERESTIND", "RAJESHEXPO", "SHILPAMED", "GILLETTE",
-        "HEXAWARE", "WIPRO", "MINDTREE", "LTI", "MPHASIS", "TECHM", "ZENSAR",
-        "CYIENT", "LTTS", "PERSISTENT", "KPITTECH", "SONATA", "NEWGEN", "ROHLTD",
-        "RAMSARUP", "CENTURYPLY", "GREENPLY", "RUSHIL", "STYLAM", "SHRIRAMFIN",
-        "BAJAJFINSV", "MUTHOOTFIN", "MANAPPURAM", "LICHSGFIN", "RELIANCE",
-        "ADANIENT", "ADANIPORTS", "ADANIGREEN", "ADANIPOWER", "ADANITRANS",
-        "ADANIWILMAR", "ALKEM", "APLLTD", "ASTRAL", "AUBANK", "BAJAJHLDNG",
-        "BALKRISIND", "BANDHANBNK", "BANKBARODA", "BEL", "BHARATFORG", "BHEL",
-        "BIOCON", "BOSCHLTD", "BPCL", "BRITANNIA", "CADILAHC", "CANBK",
-        "CHOLAFIN", "CIPLA", "COALINDIA", "COFORGE", "CONCOR", "CUMMINSIND",
-        "DABUR", "DALBHARAT", "DEEPAKNTR", "DIVISLAB", "DLF", "DRREDDY",
-        "EICHERMOT", "ESCORTS", "EXIDEIND", "FEDERALBNK", "GAIL", "GLENMARK",
-        "GODREJCP", "GODREJPROP", "GRASIM", "GUJGASLTD", "HAVELLS", "HCLTECH",
-        "HDFCAMC", "HDFCBANK", "HDFCLIFE", "HEROMOTOCO", "HINDALCO", "HINDPETRO",
-        "HINDUNILVR", "ICICIBANK", "ICICIGI", "ICICIPRULI", "IDEA", "IDFCFIRSTB",
-        "IEX", "IGL", "INDIGO", "INDUSINDBK", "INFRATEL", "INFY", "IOC",
-        "IPCALAB", "ITC", "JINDALSAW", "JKCEMENT", "JSWSTEEL", "JUBLFOOD",
-        "KOTAKBANK", "L&TFH", "LICHSGFIN", "LT", "LTI", "LTTS", "LUPIN",
-        "M&M", "M&MFIN", "MANAPPURAM", "MARICO", "MARUTI", "MCDOWELL-N",
-        "MCX", "METROPOLIS", "MFSL", "MGL", "MINDTREE", "MPHASIS", "MRF",
-        "MUTHOOTFIN", "NAM-INDIA", "NAUKRI", "NAZARA", "NESTLEIND", "NMDC",
-        "NTPC", "OBEROIRLTY", "OFSS", "ONGC", "PAGEIND", "PAGEIND", "PEL",
-        "PETRONET", "PFC", "PIDILITIND", "PIIND", "PNB", "POLICYBZR", "POWERGRID",
-        "PVR", "RAMCOCEM", "RBLBANK", "RECLTD", "RELIANCE", "SAIL", "SBILIFE",
-        "SBIN", "SHREECEM", "SIEMENS", "SRF", "SRTRANSFIN", "SUNPHARMA",
-        "SUNTV", "TATACHEM", "TATACONSUM", "TATAMOTORS", "TATAPOWER", "TATASTEEL",
-        "TECHM", "TITAN", "TORNTPHARM", "TRENT", "TVSMOTOR", "UBL", "ULTRACEMCO",
-        "UPL", "VEDL", "VOLTAS", "WIPRO", "ZEEL", "ZOMATO", "ZYDUSLIFE"
-    ]
+    # Fall back to the known NSE stocks when no live list is given
+    if symbols is None:
+        symbols = NSE_SYMBOLS
     
     # Generate more variations by adding common suffixes and patterns
     extended_nse = []
-    for stock in nse_stocks:
+    for stock in symbols:
         extended_nse.append(stock)
         extended_nse.append(f"{stock}-EQ")  # Equity suffix
         extended_nse.append(f"{stock}-BE")  # B group
@@ -71,64 +479,53 @@ def get_nse_stocks() -> List[str]:
         extended_nse.append(f"NSE:{stock}")  # Exchange prefix
     
     print(f"Collected {len(set(extended_nse))} NSE stock symbols")
-    return list(set(extended_nse))
+    return sorted(set(extended_nse))
 
 
-def get_bse_stocks() -> List[str]:
+def get_bse_stocks(codes: Optional[List[str]] = None,
+                   names: Optional[List[str]] = None) -> List[str]:
     """Fetch BSE stock symbols"""
     print("Fetching BSE stock data...")
     
-    # BSE stock list - using known BSE stocks
-    bse_stocks = [
-        "500325", "500209", "500180", "500675", "500696", "500112", "532174",
-        "500010", "532755", "532540", "500570", "532187", "500295", "500247",
-        "500300", "500440", "532977", "500103", "532538", "500087", "500104",
-        "500470", "500124", "532461", "500253", "500114", "500106", "532222",
-        "532868", "500116", "500124", "500119", "500139", "500125", "500182",
-        "500103", "500087", "500124", "500253", "500114", "500106", "532222",
-        "532868", "500116", "500325", "500209", "500180", "500675", "500696",
-        "500112", "532174", "500010", "532755", "532540", "500570", "532187",
-        "500295", "500247", "500300", "500440", "532977", "532538", "532461"
-    ]
-    
-    # Add company names that correspond to BSE codes
-    bse_names = [
-        "RELIANCE", "TCS", "HDFC BANK", "INFOSYS", "HUL", "ICICI BANK",
-        "BHARTI AIRTEL", "SBI", "BAJAJ FINANCE", "LIC", "ITC", "LARSEN",
-        "HCL TECH", "AXIS BANK", "KOTAK MAHINDRA", "ASIAN PAINTS", "MARUTI",
-        "TITAN", "ULTRATECH", "SUN PHARMA", "NTPC", "ONGC", "NESTLE",
-        "POWER GRID", "M&M", "TATA STEEL", "ADANI ENTERPRISES", "JSW STEEL",
-        "WIPRO", "HINDALCO", "COAL INDIA", "TECH MAHINDRA", "GRASIM",
-        "DIVI'S LAB", "BAJAJ FINSERV", "TATA MOTORS", "CIPLA", "SBI LIFE",
-        "DR REDDY", "EICHER MOTORS", "HERO MOTOCORP", "BRITANNIA", "BPCL",
-        "IOC", "INDUSIND BANK", "ADANI PORTS", "APOLLO HOSPITALS", "TATA CONSUMER",
-        "BAJAJ AUTO", "MARICO", "VEDANTA", "GODREJ CONSUMER", "PIDILITE",
-        "DABUR", "HAVELLS", "SHREE CEMENT", "AMBuja CEMENT", "BANK OF BARODA"
-    ]
+    # Fall back to the known BSE stocks when no live list is given
+    if codes is None:
+        codes = BSE_CODES
+    if names is None:
+        names = BSE_NAMES
     
     # Combine codes and names
     extended_bse = []
-    for code in bse_stocks:
+    for code in codes:
         extended_bse.append(code)
         extended_bse.append(f"BSE:{code}")
         extended_bse.append(f"{code}-BSE")
     
-    for name in bse_names:
+    for name in names:
         extended_bse.append(name)
         extended_bse.append(name.replace(" ", ""))
         extended_bse.append(f"BSE-{name}")
         extended_bse.append(f"{name}-BSE")
     
     print(f"Collected {len(set(extended_bse))} BSE stock symbols")
-    return list(set(extended_bse))
+    return sorted(set(extended_bse))
 
 
-def generate_stock_corpus() -> List[str]:
-    """Generate a comprehensive corpus of Indian stock market data"""
+def generate_stock_corpus(repetitions: int = CORPUS_REPETITIONS,
+                          nse_symbols: Optional[List[str]] = None,
+                          bse_codes: Optional[List[str]] = None,
+                          bse_names: Optional[List[str]] = None,
+                          case_variants: bool = True) -> List[str]:
+    """Generate a comprehensive corpus of Indian stock market data
+    
+    Symbol lists default to the built-in ones; pass the output of
+    fetch_live_symbols() to build the corpus from current listings.
+    case_variants=False skips the lower/UPPER copies of each term, which
+    a case-normalizing tokenizer would fold together anyway.
+    """
     print("Generating stock market corpus...")
     
-    nse_stocks = get_nse_stocks()
-    bse_stocks = get_bse_stocks()
+    nse_stocks = get_nse_stocks(nse_symbols)
+    bse_stocks = get_bse_stocks(bse_codes, bse_names)
     
     # Combine all stocks
     all_stocks = nse_stocks + bse_stocks
@@ -136,220 +533,98 @@ def generate_stock_corpus() -> List[str]:
     # Create corpus with various formats and patterns
     corpus = []
     
+    def with_variants(terms: List[str], upper: bool = True) -> List[str]:
+        """Terms followed by their lowercase (and uppercase) copies"""
+        if not case_variants:
+            return list(terms)
+        variants = list(terms) + [t.lower() for t in terms]
+        if upper:
+            variants += [t.upper() for t in terms]
+        return variants
+    
     # Add stock symbols multiple times with variations
-    corpus.extend(all_stocks)
-    corpus.extend([s.lower() for s in all_stocks])
-    corpus.extend([s.upper() for s in all_stocks])
+    corpus.extend(with_variants(all_stocks))
     
     # Add patterns like "Buy RELIANCE", "Sell TCS", etc.
-    actions = ["Buy", "Sell", "Hold", "Trade", "Invest", "Stock", "Share", 
-               "Equity", "Security", "Instrument", "Listing", "IPO", "FPO",
-               "Purchase", "Acquire", "Dispose", "Transfer", "Allocate",
-               "Portfolio", "Position", "Long", "Short", "Call", "Put",
-               "Option", "Future", "Derivative", "Contract", "Expiry",
-               "Strike", "Premium", "Volume", "Liquidity", "Volatility"]
-    
-    for action in actions:
+    for action in ACTIONS:
         for stock in all_stocks[:150]:  # Increased limit
             corpus.append(f"{action} {stock}")
             corpus.append(f"{stock} {action}")
-            corpus.append(f"{action} {stock.lower()}")
-            corpus.append(f"{stock.upper()} {action}")
+            if case_variants:
+                corpus.append(f"{action} {stock.lower()}")
+                corpus.append(f"{stock.upper()} {action}")
     
     # Add market-related terms with variations
-    market_terms = [
-        "National Stock Exchange", "NSE", "Bombay Stock Exchange", "BSE",
-        "Sensex", "Nifty", "Nifty 50", "Nifty 500", "Nifty Next 50",
-        "Nifty Midcap", "Nifty Smallcap", "Nifty Bank", "Nifty IT",
-        "Nifty Pharma", "Nifty Auto", "Nifty FMCG", "Nifty Metal",
-        "Nifty Energy", "Nifty Realty", "Nifty PSU Bank", "Nifty Private Bank",
-        "Midcap", "Smallcap", "Largecap", "Megacap", "Microcap",
-        "Market Cap", "Market Capitalization", "Free Float Market Cap",
-        "Volume", "Trading Volume", "Average Volume", "Volume Weighted",
-        "Price", "Current Price", "Closing Price", "Opening Price",
-        "High", "Day High", "52 Week High", "All Time High",
-        "Low", "Day Low", "52 Week Low", "All Time Low",
-        "Open", "Close", "Last Traded Price", "Bid Price", "Ask Price",
-        "Dividend", "Dividend Yield", "Dividend Per Share", "Ex-Dividend",
-        "PE Ratio", "Price to Earnings", "Trailing PE", "Forward PE",
-        "PB Ratio", "Price to Book", "Price to Sales", "PS Ratio",
-        "ROE", "Return on Equity", "ROCE", "Return on Capital Employed",
-        "ROA", "Return on Assets", "EPS", "Earnings Per Share",
-        "Diluted EPS", "Basic EPS", "Revenue", "Total Revenue",
-        "Net Revenue", "Operating Revenue", "Profit", "Net Profit",
-        "Gross Profit", "Operating Profit", "EBITDA", "EBIT",
-        "Free Float", "Index Weight", "Sector Weight", "Stock Weight",
-        "Sector", "Industry", "Sub Industry", "Industry Classification",
-        "Financial Services", "Banking", "Private Bank", "Public Bank",
-        "NBFC", "Insurance", "Life Insurance", "General Insurance",
-        "Technology", "IT Services", "Software", "Hardware",
-        "Pharmaceuticals", "Pharma", "Biotech", "Healthcare",
-        "FMCG", "Fast Moving Consumer Goods", "Consumer Goods",
-        "Automobile", "Auto", "Auto Ancillary", "Two Wheeler",
-        "Four Wheeler", "Commercial Vehicle", "Passenger Vehicle",
-        "Oil & Gas", "Oil", "Gas", "Refining", "Exploration",
-        "Power", "Power Generation", "Power Transmission", "Power Distribution",
-        "Metals", "Steel", "Aluminum", "Copper", "Iron", "Gold",
-        "Cement", "Building Materials", "Construction Materials",
-        "Real Estate", "Construction", "Infrastructure", "Engineering",
-        "Telecom", "Telecommunications", "Mobile Services", "Broadband",
-        "Media", "Entertainment", "Broadcasting", "Print Media",
-        "Retail", "E-commerce", "Consumer Services", "Hospitality",
-        "Healthcare", "Hospitals", "Diagnostics", "Medical Devices",
-        "Chemicals", "Specialty Chemicals", "Petrochemicals",
-        "Textiles", "Garments", "Apparel", "Fashion",
-        "Agriculture", "Agri Business", "Fertilizers", "Pesticides",
-        "Shipping", "Logistics", "Transportation", "Aviation",
-        "Ports", "Airports", "Roads", "Highways"
-    ]
-    
-    corpus.extend(market_terms)
-    corpus.extend([t.lower() for t in market_terms])
-    corpus.extend([t.upper() for t in market_terms])
+    corpus.extend(with_variants(MARKET_TERMS))
     
     # Add company names and tickers together
-    company_names = [
-        "Reliance Industries", "Reliance", "RIL",
-        "Tata Consultancy Services", "TCS", "Tata CS",
-        "HDFC Bank", "HDFC", "HDFC Bank Limited",
-        "Infosys", "Infosys Limited", "Infosys Technologies",
-        "Hindustan Unilever", "HUL", "Hindustan Unilever Limited",
-        "ICICI Bank", "ICICI", "ICICI Bank Limited",
-        "Bharti Airtel", "Airtel", "Bharti",
-        "State Bank of India", "SBI", "State Bank",
-        "Bajaj Finance", "Bajaj Finserv", "Bajaj",
-        "Life Insurance Corporation", "LIC", "LIC of India",
-        "ITC Limited", "ITC", "Indian Tobacco Company",
-        "Larsen & Toubro", "L&T", "L and T", "Larsen Toubro",
-        "HCL Technologies", "HCL", "HCL Tech",
-        "Axis Bank", "Axis", "Axis Bank Limited",
-        "Kotak Mahindra Bank", "Kotak Bank", "Kotak",
-        "Asian Paints", "Asian", "Asian Paints Limited",
-        "Maruti Suzuki", "Maruti", "Maruti Suzuki India",
-        "Titan Company", "Titan", "Titan Industries",
-        "UltraTech Cement", "UltraTech", "Ultra Tech",
-        "Sun Pharmaceutical", "Sun Pharma", "Sun",
-        "NTPC", "National Thermal Power Corporation",
-        "Oil and Natural Gas", "ONGC", "Oil Natural Gas",
-        "Nestle India", "Nestle", "Nestle India Limited",
-        "Power Grid Corporation", "PowerGrid", "PGCIL",
-        "Mahindra & Mahindra", "M&M", "Mahindra",
-        "Tata Steel", "Tata Steel Limited", "TSL",
-        "Adani Enterprises", "Adani", "Adani Group",
-        "JSW Steel", "JSW", "JSW Steel Limited",
-        "Wipro", "Wipro Limited", "Wipro Technologies",
-        "Hindalco", "Hindalco Industries", "Hindalco Limited",
-        "Coal India", "CIL", "Coal India Limited",
-        "Tech Mahindra", "TechM", "Tech Mahindra Limited",
-        "Grasim Industries", "Grasim", "Grasim Limited",
-        "Divi's Laboratories", "Divi Labs", "Divi",
-        "Tata Motors", "TML", "Tata Motors Limited",
-        "Cipla", "Cipla Limited", "Cipla India",
-        "SBI Life Insurance", "SBI Life", "SBI Life Insurance Company",
-        "Dr Reddy's Laboratories", "Dr Reddy", "DRL",
-        "Eicher Motors", "Eicher", "Eicher Motors Limited",
-        "Hero MotoCorp", "Hero", "Hero Honda",
-        "Britannia Industries", "Britannia", "Britannia Limited",
-        "Bharat Petroleum", "BPCL", "BP",
-        "Indian Oil Corporation", "IOC", "Indian Oil"
-    ]
-    
-    corpus.extend(company_names)
-    corpus.extend([n.lower() for n in company_names])
-    corpus.extend([n.upper() for n in company_names])
+    corpus.extend(with_variants(COMPANY_NAMES))
     
     # Add financial metrics and ratios
-    financial_terms = [
-        "Balance Sheet", "Profit and Loss", "P&L", "Cash Flow",
-        "Annual Report", "Quarterly Results", "Earnings Report",
-        "Market Share", "Revenue Growth", "Profit Growth",
-        "Margin", "Operating Margin", "Net Margin", "Gross Margin",
-        "Debt", "Total Debt", "Net Debt", "Debt to Equity",
-        "Current Ratio", "Quick Ratio", "Debt Ratio",
-        "Asset Turnover", "Inventory Turnover", "Receivables Turnover",
-        "Working Capital", "Current Assets", "Current Liabilities",
-        "Fixed Assets", "Intangible Assets", "Goodwill",
-        "Shareholders Equity", "Book Value", "Market Value",
-        "Beta", "Alpha", "Standard Deviation", "Variance",
-        "CAGR", "Compound Annual Growth Rate", "YOY", "Year on Year",
-        "QOQ", "Quarter on Quarter", "MOM", "Month on Month",
-        "Promoter Holding", "Public Holding", "FII Holding", "DII Holding",
-        "Foreign Institutional Investor", "Domestic Institutional Investor",
-        "Mutual Fund", "ETF", "Exchange Traded Fund", "Index Fund",
-        "Active Fund", "Passive Fund", "Hedge Fund", "Pension Fund"
-    ]
-    
-    corpus.extend(financial_terms)
-    corpus.extend([t.lower() for t in financial_terms])
+    corpus.extend(with_variants(FINANCIAL_TERMS, upper=False))
     
     # Add trading terms
-    trading_terms = [
-        "Market Order", "Limit Order", "Stop Loss", "Take Profit",
-        "Day Order", "GTC Order", "IOC Order", "FOK Order",
-        "Bulk Deal", "Block Deal", "Insider Trading", "Circuit Breaker",
-        "Upper Circuit", "Lower Circuit", "Price Band", "Freeze",
-        "Suspended", "Delisted", "Listed", "IPO", "FPO", "OFS",
-        "Offer for Sale", "Buyback", "Bonus Issue", "Stock Split",
-        "Right Issue", "Preferential Allotment", "Qualified Placement",
-        "Demat", "Dematerialization", "Remat", "Rematerialization",
-        "Trading Account", "Demat Account", "Bank Account", "KYC",
-        "Know Your Customer", "PAN", "Aadhaar", "GST", "TDS"
-    ]
-    
-    corpus.extend(trading_terms)
-    corpus.extend([t.lower() for t in trading_terms])
+    corpus.extend(with_variants(TRADING_TERMS, upper=False))
     
     # Add index constituents (sample)
-    index_constituents = [
-        "Nifty 50 Constituents", "Sensex 30 Constituents",
-        "Nifty Next 50 Constituents", "Nifty Midcap 150",
-        "Nifty Smallcap 250", "Nifty 500 Constituents",
-        "Nifty Bank Index", "Nifty IT Index", "Nifty Pharma Index",
-        "Nifty Auto Index", "Nifty FMCG Index", "Nifty Metal Index"
-    ]
-    
-    corpus.extend(index_constituents)
+    corpus.extend(INDEX_CONSTITUENTS)
     
     # Create sentences and phrases for better tokenization
     phrases = []
-    for i in range(len(all_stocks[:200])):
-        stock = all_stocks[i]
-        phrases.extend([
-            f"{stock} stock price",
-            f"{stock} share price",
-            f"{stock} current price",
-            f"{stock} market cap",
-            f"{stock} PE ratio",
-            f"{stock} dividend yield",
-            f"{stock} 52 week high",
-            f"{stock} 52 week low",
-            f"{stock} volume",
-            f"{stock} on NSE",
-            f"{stock} on BSE",
-            f"Buy {stock}",
-            f"Sell {stock}",
-            f"Hold {stock}",
-            f"{stock} analysis",
-            f"{stock} news",
-            f"{stock} results",
-            f"{stock} earnings"
-        ])
+    for stock in all_stocks[:200]:
+        phrases.extend([template.format(stock=stock) for template in PHRASE_TEMPLATES])
     
     corpus.extend(phrases)
     
     # Repeat corpus multiple times to increase frequency of patterns
-    # This helps BPE learn better tokenizations and reach higher vocab sizes
-    expanded_corpus = corpus * 15  # Increased repetition
+    expanded_corpus = corpus * repetitions
     
     print(f"Generated corpus with {len(expanded_corpus)} entries")
     print(f"Unique entries: {len(set(corpus))}")
     return expanded_corpus
 
 
+def corpus_inputs(repetitions: int = CORPUS_REPETITIONS,
+                  nse_symbols: Optional[List[str]] = None,
+                  bse_codes: Optional[List[str]] = None,
+                  bse_names: Optional[List[str]] = None,
+                  case_variants: bool = True) -> Dict:
+    """Collect everything generate_stock_corpus depends on, for cache keys"""
+    return {
+        'nse_symbols': NSE_SYMBOLS if nse_symbols is None else nse_symbols,
+        'bse_codes': BSE_CODES if bse_codes is None else bse_codes,
+        'bse_names': BSE_NAMES if bse_names is None else bse_names,
+        'actions': ACTIONS,
+        'market_terms': MARKET_TERMS,
+        'company_names': COMPANY_NAMES,
+        'financial_terms': FINANCIAL_TERMS,
+        'trading_terms': TRADING_TERMS,
+        'index_constituents': INDEX_CONSTITUENTS,
+        'phrase_templates': PHRASE_TEMPLATES,
+        'repetitions': repetitions,
+        'case_variants': case_variants,
+        # Inline suffixes, case variants and slicing live in the generator code
+        'generator_source': [
+            inspect.getsource(get_nse_stocks),
+            inspect.getsource(get_bse_stocks),
+            inspect.getsource(generate_stock_corpus),
+        ],
+    }
+
+
+def get_ticker_tokens(nse_symbols: Optional[List[str]] = None,
+                      bse_codes: Optional[List[str]] = None,
+                      bse_names: Optional[List[str]] = None) -> List[str]:
+    """Listed symbols, BSE codes and company names to register as added tokens"""
+    nse_symbols = NSE_SYMBOLS if nse_symbols is None else nse_symbols
+    bse_codes = BSE_CODES if bse_codes is None else bse_codes
+    bse_names = BSE_NAMES if bse_names is None else bse_names
+    return list(dict.fromkeys(nse_symbols + bse_codes + bse_names))
+
+
 def save_corpus(corpus: List[str], filename: str = "stock_corpus.txt"):
     """Save corpus to file"""
     with open(filename, 'w') as f:
         for item in corpus:
             f.write(item + '\n')
     print(f"Corpus saved to {filename}")
-
@@ -0,0 +1,100 @@
+"""
+SymbolFetcher against a local http.server stub
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stock_data import SymbolFetcher, NSE_LIST_PATHS, parse_nse_equity_list
+
+
+NSE_BODY = b"SYMBOL,NAME OF COMPANY,SERIES\nRELIANCE,Reliance Industries Limited,EQ\n"
+ETAG = '"v1"'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves NSE_BODY with an ETag; answers 304 to a matching If-None-Match"""
+
+    requests_seen = []  # (path, If-None-Match) per request
+    always_304 = False
+
+    def do_GET(self):
+        etag = self.headers.get('If-None-Match')
+        self.requests_seen.append((self.path, etag))
+        if etag == ETAG or self.always_304:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(NSE_BODY)))
+        self.end_headers()
+        self.wfile.write(NSE_BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class SymbolFetcherTest(unittest.TestCase):
+
+    def setUp(self):
+        StubHandler.requests_seen = []
+        StubHandler.always_304 = False
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.cache_dir = tempfile.mkdtemp()
+        self.url = self.base_url + NSE_LIST_PATHS[0]
+
+    def tearDown(self):
+        self.stop_server()
+
+    def stop_server(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def make_fetcher(self):
+        return SymbolFetcher(nse_base_url=self.base_url, bse_base_url=self.base_url,
+                             cache_dir=self.cache_dir, requests_per_second=0,
+                             max_retries=0, timeout=2.0)
+
+    def test_fetch_revalidate_then_fall_back_to_cache(self):
+        fetcher = self.make_fetcher()
+
+        # 200: body is returned and cached with its ETag
+        self.assertEqual(fetcher.fetch(self.url), NSE_BODY)
+        self.assertEqual(StubHandler.requests_seen[-1], (NSE_LIST_PATHS[0], None))
+
+        # 304: the cached copy is revalidated with If-None-Match
+        self.assertEqual(fetcher.fetch(self.url), NSE_BODY)
+        self.assertEqual(StubHandler.requests_seen[-1], (NSE_LIST_PATHS[0], ETAG))
+        self.assertEqual(len(StubHandler.requests_seen), 2)
+
+        # Server down: the cached copy is used
+        self.stop_server()
+        body = fetcher.fetch(self.url)
+        self.assertEqual(body, NSE_BODY)
+        self.assertEqual(parse_nse_equity_list(body),
+                         [('RELIANCE', 'Reliance Industries Limited')])
+
+    def test_304_without_cached_copy_is_an_error(self):
+        StubHandler.always_304 = True
+        fetcher = self.make_fetcher()
+        with self.assertRaises(requests.HTTPError):
+            fetcher.fetch(self.url)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,27 +2,141 @@
 Train BPE tokenizer on Indian stock market data
 """
 
-from bpe_tokenizer import BPETokenizer
-from stock_data import generate_stock_corpus, save_corpus
+from bpe_tokenizer import BPETokenizer, split_case
+from stock_data import (generate_stock_corpus, save_corpus, corpus_inputs,
+                        get_ticker_tokens, fetch_live_symbols, SymbolFetcher, NSE_BASE_URL, BSE_BASE_URL)
+from artifact_cache import ArtifactCache, compute_key, DEFAULT_CACHE_DIR
+import argparse
+import bpe_numpy
+import filecmp
+import inspect
 import json
+import os
+import shutil
 
 
-def main():
+TOKENIZER_PATH = "bpe_tokenizer.json"
+# Case-normalized runs stop short of the 5000-token target on this corpus, so
+# they are kept apart from the production tokenizer the app loads
+CASE_NORMALIZED_PATH = "bpe_tokenizer_case_normalized.json"
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Train the Indian stock market BPE tokenizer")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore cached artifacts and regenerate corpus and tokenizer")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or write the artifact cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"Artifact cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=float, default=512,
+                        help="Evict least recently used artifacts above this size (default: 512)")
+    parser.add_argument("--cache-max-age-days", type=float, default=30,
+                        help="Evict artifacts unused for this many days (default: 30)")
+    parser.add_argument("--live-symbols", action="store_true",
+                        help="Build the corpus from live NSE/BSE listings instead of the built-in lists")
+    parser.add_argument("--nse-base-url", default=NSE_BASE_URL,
+                        help="Base URL for NSE symbol lists")
+    parser.add_argument("--bse-base-url", default=BSE_BASE_URL,
+                        help="Base URL for BSE symbol lists")
+    parser.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto",
+                        help="Pair statistics backend for training (default: numpy if installed)")
+    parser.add_argument("--case-normalize", action="store_true",
+                        help="Lowercase words before BPE and encode case with marker tokens "
+                             f"(saved to {CASE_NORMALIZED_PATH} unless --output is given)")
+    parser.add_argument("--output", default=None,
+                        help=f"Where to save the trained tokenizer (default: {TOKENIZER_PATH})")
+    parser.add_argument("--ticker-tokens", action="store_true",
+                        help="Register listed symbols and company names as single added tokens")
+    return parser.parse_args(argv)
+
+
+def training_source():
+    """Source of the code that turns a corpus into merges, for the tokenizer cache key"""
+    return [
+        inspect.getsource(split_case),
+        inspect.getsource(BPETokenizer._get_word_freqs),
+        inspect.getsource(BPETokenizer._get_stats),
+        inspect.getsource(BPETokenizer._merge_vocab),
+        inspect.getsource(BPETokenizer.train),
+        inspect.getsource(bpe_numpy),
+    ]
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
     print("=" * 60)
     print("Indian Stock Market BPE Tokenizer Training")
     print("=" * 60)
     
-    # Generate corpus
-    corpus = generate_stock_corpus()
-    save_corpus(corpus, "stock_corpus.txt")
-    
     # Train tokenizer with target of 5000+ tokens
     # We'll train to 5500 to ensure we exceed 5000
     target_vocab_size = 5500
-    tokenizer = BPETokenizer(vocab_size=target_vocab_size)
     
-    # Train
-    tokenizer.train(corpus)
+    cache = None
+    if not args.no_cache:
+        cache = ArtifactCache(
+            args.cache_dir,
+            max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            max_age_seconds=args.cache_max_age_days * 24 * 60 * 60
+        )
+        cache.evict()
+    
+    # Symbol lists: built-in by default, or fetched (incrementally) from the exchanges
+    symbols = {}
+    if args.live_symbols:
+        fetcher = SymbolFetcher(nse_base_url=args.nse_base_url, bse_base_url=args.bse_base_url)
+        symbols = fetch_live_symbols(fetcher)
+    
+    # Case variants are redundant once the tokenizer folds case itself
+    corpus_options = dict(symbols, case_variants=not args.case_normalize)
+    corpus_key = compute_key('corpus', corpus_inputs(**corpus_options))
+    tokenizer_key = compute_key('tokenizer', corpus_key, {
+        'vocab_size': target_vocab_size,
+        'case_normalize': args.case_normalize,
+        # A cached tokenizer is stale once the training code changes
+        'training_source': training_source(),
+    })
+    
+    # Generate corpus (or reuse the cached one)
+    corpus = None
+    if cache is not None and not args.force:
+        corpus = cache.load_corpus(corpus_key)
+        if corpus is not None:
+            print(f"Corpus cache hit ({corpus_key[:12]}): {len(corpus)} entries")
+    if corpus is None:
+        corpus = generate_stock_corpus(**corpus_options)
+        if cache is not None:
+            cache.store_corpus(corpus_key, corpus)
+    
+    cached_corpus_path = cache.path('corpus', corpus_key, 'txt') if cache is not None else None
+    if cached_corpus_path and os.path.exists(cached_corpus_path):
+        # Only touch stock_corpus.txt when its contents actually change
+        if not (os.path.exists("stock_corpus.txt")
+                and filecmp.cmp(cached_corpus_path, "stock_corpus.txt", shallow=False)):
+            shutil.copyfile(cached_corpus_path, "stock_corpus.txt")
+            print("Corpus saved to stock_corpus.txt")
+    else:
+        save_corpus(corpus, "stock_corpus.txt")
+    
+    # Train (or reuse the cached tokenizer)
+    tokenizer = None
+    if cache is not None and not args.force:
+        tokenizer = cache.load_tokenizer(tokenizer_key)
+        if tokenizer is not None:
+            print(f"Tokenizer cache hit ({tokenizer_key[:12]}): skipping training")
+    if tokenizer is None:
+        tokenizer = BPETokenizer(vocab_size=target_vocab_size, case_normalize=args.case_normalize)
+        tokenizer.train(corpus, backend=args.backend)
+        if cache is not None:
+            cache.store_tokenizer(tokenizer_key, tokenizer)
+    
+    if args.ticker_tokens:
+        # Added after caching: registration is cheap and does not change training
+        added = tokenizer.add_tokens(get_ticker_tokens(**symbols))
+        print(f"Registered {added} ticker tokens ({len(tokenizer.vocab)} total ids)")
     
     # Verify vocabulary size
     vocab_size = len(tokenizer.vocab)
@@ -42,9 +156,10 @@ def main():
     print(f"Status: {'✓ PASSED' if compression_ratio >= 3.0 else '✗ FAILED'}")
     
     # Save tokenizer
-    tokenizer.save("bpe_tokenizer.json")
+    output_path = args.output or (CASE_NORMALIZED_PATH if args.case_normalize else TOKENIZER_PATH)
+    tokenizer.save(output_path)
     print(f"\n{'='*60}")
-    print("Tokenizer saved to bpe_tokenizer.json")
+    print(f"Tokenizer saved to {output_path}")
     
     # Show some examples
     print(f"\n{'='*60}")
@@ -0,0 +1,141 @@
+"""
+Process pool for encode/decode requests
+
+Encoding is pure Python, so requests handled on threads serialize on the
+GIL. TokenizerPool runs them in worker processes instead. Workers are
+forked from the process that already holds the tokenizer and use that
+inherited copy, shared copy-on-write with the parent, so nothing is loaded
+or unpickled per worker and only request text and ids cross the process
+boundary. Forking is only safe while no other threads are running, so
+create the pool first (app.py does so before importing gradio). Otherwise,
+or where fork is unavailable, workers start through forkserver/spawn and
+each loads its own copy from the tokenizer state.
+
+A bounded number of requests may be in flight: further submissions wait
+briefly for a slot and are then rejected with PoolBusy, and each request
+has its own timeout, after which PoolTimeout is raised.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional
+import multiprocessing
+import os
+import threading
+
+from bpe_tokenizer import BPETokenizer, StreamingDecoder
+
+
+DEFAULT_TIMEOUT = 10.0  # Seconds to wait for a submitted request, queued or running
+DEFAULT_QUEUE_WAIT = 0.5  # Seconds to wait for a free slot before rejecting
+
+
+class PoolBusy(RuntimeError):
+    """Raised when every slot in the pool's bounded queue is taken"""
+
+
+class PoolTimeout(TimeoutError):
+    """Raised when a request does not finish within the pool's timeout"""
+
+
+# Tokenizer and reverse vocab used by worker processes. With fork they are
+# set in the parent and inherited; otherwise _init_worker() builds them.
+_worker_tokenizer = None
+_worker_id_to_token = None
+
+
+def _use_tokenizer(tokenizer: BPETokenizer):
+    """Make tokenizer the one the worker functions run on"""
+    global _worker_tokenizer, _worker_id_to_token
+    _worker_tokenizer = tokenizer
+    _worker_id_to_token = {v: k for k, v in tokenizer.vocab.items()}
+
+
+def _init_worker(state: Optional[Dict] = None, encode_backend: str = 'regex'):
+    """Worker initializer: load the tokenizer from state unless it was inherited"""
+    if state is not None:
+        tokenizer = BPETokenizer(encode_backend=encode_backend)
+        tokenizer.load_state(state)
+        # Built at startup rather than on the worker's first request
+        tokenizer._get_merge_patterns()
+        tokenizer._get_merge_ranks()
+        _use_tokenizer(tokenizer)
+    # The parent records usage from the returned ids
+    _worker_tokenizer.usage = None
+
+
+def _ping(_) -> int:
+    """No-op task used to start the workers"""
+    return os.getpid()
+
+
+def _encode(text: str) -> List[int]:
+    """Encode one request in a worker"""
+    return _worker_tokenizer.encode(text)
+
+
+def _decode_pieces(token_ids: List[int]) -> List[str]:
+    """Streaming-decoder pieces, so the caller can still show words as they complete"""
+    decoder = StreamingDecoder(_worker_tokenizer, id_to_token=_worker_id_to_token)
+    return list(decoder.decode_stream(token_ids))
+
+
+class TokenizerPool:
+    """Worker processes running encode/decode for one tokenizer"""
+
+    def __init__(self, tokenizer: BPETokenizer, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, timeout: float = DEFAULT_TIMEOUT,
+                 queue_wait: float = DEFAULT_QUEUE_WAIT):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.timeout = timeout
+        self.queue_wait = queue_wait
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+        methods = multiprocessing.get_all_start_methods()
+        if 'fork' in methods and threading.active_count() == 1:
+            # Workers inherit the tokenizer set here, with its merge tables
+            # already built so no worker rebuilds them on its first request
+            tokenizer._get_merge_patterns()
+            tokenizer._get_merge_ranks()
+            _use_tokenizer(tokenizer)
+            context = multiprocessing.get_context('fork')
+            initargs = ()
+        else:
+            # Forking a process with running threads can deadlock the child
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            initargs = (tokenizer.get_state(), tokenizer.encode_backend)
+        self.start_method = context.get_start_method()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context,
+            initializer=_init_worker, initargs=initargs)
+        # Start every worker now, before the caller starts serving threads
+        list(self._executor.map(_ping, range(self.workers)))
+
+    def _run(self, fn, arg):
+        """Submit one request under the queue bound and wait for its result"""
+        if not self._slots.acquire(timeout=self.queue_wait):
+            raise PoolBusy(f"all {self.max_pending} request slots are busy")
+        try:
+            future = self._executor.submit(fn, arg)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot frees when the worker finishes, even if the caller gave up
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()  # Only succeeds while the request is still queued
+            raise PoolTimeout(f"request did not finish within {self.timeout:g}s")
+
+    def encode(self, text: str) -> List[int]:
+        """Encode text in a worker process"""
+        return self._run(_encode, text)
+
+    def decode_pieces(self, token_ids: List[int]) -> List[str]:
+        """Decode ids in a worker process; joined pieces equal tokenizer.decode()"""
+        return self._run(_decode_pieces, token_ids)
+
+    def close(self):
+        """Stop the workers"""
+        self._executor.shutdown(wait=True, cancel_futures=True)